@@ -1,7 +1,40 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .utils.settings import settings
-from .routers import churn, chat, call_center, computer_vision
+from .routers import churn, chat, call_center, computer_vision, health, models
+from .services.model import stop_batcher, watch_registry
+from .services.warmup import warmup
+from .services.aggregates import ensure_views, reconcile_loop
+from core.ollama_async import close_async_clients
+from db.engine import close_async_engines, dispose_engines
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so /ready can answer 503 while loading
+    if settings.WARMUP_ON_STARTUP:
+        warmup.start()
+    # Follow the model registry's CURRENT pointer for hot-swaps
+    watch_task = asyncio.create_task(watch_registry(settings.MODEL_WATCH_INTERVAL)) \
+        if settings.MODEL_WATCH_INTERVAL > 0 else None
+    # Load the dashboard aggregates, then recount them on a schedule
+    reconcile_task = asyncio.create_task(reconcile_loop(settings.AGGREGATES_RECONCILE_INTERVAL)) \
+        if settings.AGGREGATES_RECONCILE_INTERVAL > 0 else None
+    # Create the churn views (e.g. the /churn-trend rollup) and migrate churn_scores on
+    # databases that predate them; requests never run DDL
+    views_task = asyncio.create_task(asyncio.to_thread(ensure_views)) \
+        if settings.ENSURE_VIEWS_ON_STARTUP else None
+    yield
+    warmup.cancel()
+    for task in (watch_task, reconcile_task, views_task):
+        if task is not None and not task.done():
+            task.cancel()
+    await stop_batcher()
+    # Release the pooled Ollama and database connections
+    await close_async_clients()
+    await close_async_engines()
+    dispose_engines()
 
 def create_app() -> FastAPI:
     app = FastAPI(
@@ -9,7 +42,8 @@ def create_app() -> FastAPI:
         version=settings.APP_VERSION,
         description="AI-powered hotel customer service and analytics platform",
         docs_url="/docs",
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        lifespan=lifespan,
     )
     
     # Add CORS middleware for frontend
@@ -26,6 +60,8 @@ def create_app() -> FastAPI:
     app.include_router(chat.router)
     app.include_router(call_center.router)
     app.include_router(computer_vision.router)
+    app.include_router(health.router)
+    app.include_router(models.router)
     
     return app
 
@@ -4,6 +4,8 @@ from typing import Optional, List
 import json
 import time
 import uuid
+from ..utils.settings import settings
+from ..services.model import aanswer_question
 
 router = APIRouter(prefix="/api/call-center", tags=["call-center"])
 
@@ -31,13 +33,16 @@ class CallRecord(BaseModel):
     timestamp: str
 
 @router.post("/process", response_model=CallProcessResponse)
-def process_call_message(req: CallProcessRequest):
+async def process_call_message(req: CallProcessRequest):
     """Process customer call message with AI"""
     try:
         start_time = time.time()
         
         # Analyze the message and generate response
         analysis = analyze_customer_message(req.message)
+        if settings.ASSISTANT_BACKEND == "llm":
+            # routing/escalation stay rule-based, the answer text comes from the LLM
+            analysis["response"] = await aanswer_question(req.message)
         
         processing_time = time.time() - start_time
         
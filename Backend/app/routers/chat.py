@@ -1,8 +1,12 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
 import json
 import time
+from ..utils.settings import settings
+from ..services.model import aanswer_question, astream_answer
+from ..utils.sse import StreamTimer, sse_event
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
@@ -16,13 +20,16 @@ class ChatResponse(BaseModel):
     processing_time: Optional[float] = None
 
 @router.post("/message", response_model=ChatResponse)
-def process_message(req: ChatRequest):
+async def process_message(req: ChatRequest):
     """Process chat message with AI assistant"""
     try:
         start_time = time.time()
         
-        # Simulate AI processing
-        response = generate_ai_response(req.message, req.context)
+        if settings.ASSISTANT_BACKEND == "llm":
+            response = await aanswer_question(req.message)
+        else:
+            # Simulate AI processing
+            response = generate_ai_response(req.message, req.context)
         
         processing_time = time.time() - start_time
         
@@ -34,6 +41,34 @@ def process_message(req: ChatRequest):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/message/stream")
+async def process_message_stream(req: ChatRequest):
+    """SSE variant of /message: answer chunks as they are generated, then a final `result` event"""
+    async def events():
+        timer = StreamTimer()
+        parts = []
+        try:
+            if settings.ASSISTANT_BACKEND == "llm":
+                async for chunk in astream_answer(req.message):
+                    timer.tick()
+                    parts.append(chunk)
+                    yield sse_event("token", {"text": chunk})
+            else:
+                timer.tick()
+                parts.append(generate_ai_response(req.message, req.context))
+                yield sse_event("token", {"text": parts[0]})
+            timing = timer.summary()
+            yield sse_event("result", {
+                "response": "".join(parts),
+                "context": req.context,
+                "processing_time": timing["total_ms"] / 1000.0,
+                "timing": timing,
+            })
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 def generate_ai_response(message: str, context: str) -> str:
     """Generate AI response based on message and context"""
     message_lower = message.lower()
@@ -1,37 +1,115 @@
 from fastapi import APIRouter, HTTPException
-from ..schemas.churn import ChurnRequest, ChurnResponse, ExplainResponse
-from ..services.model import predict_proba, explain_local
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from ..schemas.churn import (ChurnRequest, ChurnResponse, ChurnBatchRequest,
+                             ChurnBatchResponse, ExplainResponse)
+from ..services.model import (apredict, predict_proba_batch, aexplain_local,
+                              astream_explanation, cache_stats, batching_stats,
+                              cascade_stats, lookup_table_info)
+from ..services.scoring_jobs import start_rescore_job, start_import_job, get_job
+from ..services.aggregates import dashboard_stats, aggregate_info, churn_trend, TrendUnavailable
+from ..utils.sse import sse_event
 
 router = APIRouter(prefix="/api/churn", tags=["churn"])
 
 @router.post("/predict", response_model=ChurnResponse)
-def predict(req: ChurnRequest):
+async def predict(req: ChurnRequest):
     try:
-        p = predict_proba(req.features_vector, req.features_dict, extra_context=req.extra_context)
-        return {"churn_proba": p}
+        return await apredict(req.features_vector, req.features_dict, extra_context=req.extra_context)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/predict-batch", response_model=ChurnBatchResponse)
+async def predict_batch(req: ChurnBatchRequest):
+    """Score many rows in one vectorized call; invalid rows are reported, not fatal"""
+    try:
+        rows = [(r.features_vector, r.features_dict) for r in req.rows]
+        # encoding a large batch is CPU-bound, keep it off the event loop
+        proba, errors = await run_in_threadpool(predict_proba_batch, rows)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    results = [
+        {"index": i, "churn_proba": None if err else float(p), "error": err}
+        for i, (p, err) in enumerate(zip(proba, errors))
+    ]
+    n_errors = sum(err is not None for err in errors)
+    return {"results": results, "n_scored": len(results) - n_errors, "n_errors": n_errors}
+
 @router.post("/explain", response_model=ExplainResponse)
-def explain(req: ChurnRequest):
+async def explain(req: ChurnRequest):
     try:
-        res = explain_local(req.features_vector, req.features_dict, top_k=8, extra_context=req.extra_context)
+        res = await aexplain_local(req.features_vector, req.features_dict, top_k=8, extra_context=req.extra_context)
         return res
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/explain/stream")
+async def explain_stream(req: ChurnRequest):
+    """SSE variant of /explain: LLM tokens as they arrive, then a final `result` event"""
+    async def events():
+        try:
+            async for event, data in astream_explanation(req.features_vector, req.features_dict,
+                                                         top_k=8, extra_context=req.extra_context):
+                yield sse_event(event, data)
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.post("/rescore-jobs", status_code=202)
+def create_rescore_job(mode: str = "incremental"):
+    """Start (or join the running) rescoring of the customers table"""
+    try:
+        return start_rescore_job(mode).to_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/rescore-jobs/{job_id}")
+def get_rescore_job(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job.to_dict()
+
+@router.post("/import-jobs", status_code=202)
+def create_import_job():
+    """Start (or join the running) upsert of IMPORT_DATA_PATH into the customers table"""
+    return start_import_job().to_dict()
+
+@router.get("/import-jobs/{job_id}")
+def get_import_job(job_id: str):
+    return get_rescore_job(job_id)
+
+@router.get("/cache-stats")
+def get_cache_stats():
+    """Prediction cache size and hit/miss counters"""
+    return cache_stats()
+
+@router.get("/batching-stats")
+def get_batching_stats():
+    """Micro-batch sizes and queue wait times of /predict"""
+    return batching_stats()
+
+@router.get("/cascade-stats")
+def get_cascade_stats():
+    """Per-tier hit ratios and latencies of the rules -> model -> LLM cascade"""
+    return cascade_stats()
+
+@router.get("/lookup-table")
+async def get_lookup_table():
+    """Size, axes and accuracy loss of the compiled lookup table (compiled on first use)"""
+    return await run_in_threadpool(lookup_table_info)
+
 # New endpoints for hotel operations
 @router.get("/dashboard-stats")
 def get_dashboard_stats():
-    """Get dashboard statistics for hotel operations"""
-    return {
-        "total_customers": 1247,
-        "churn_rate": 23.4,
-        "ai_interactions": 3421,
-        "satisfaction_score": 4.2,
-        "high_risk_customers": 156,
-        "avg_response_time": "1.2s"
-    }
+    """Customer, churn and risk totals from the incrementally maintained aggregate store"""
+    return dashboard_stats()
+
+@router.get("/aggregate-stats")
+def get_aggregate_stats():
+    """Freshness, update counts and last reconcile drift of the dashboard aggregates"""
+    return aggregate_info()
 
 @router.get("/customer-segments")
 def get_customer_segments():
@@ -45,15 +123,12 @@ def get_customer_segments():
     }
 
 @router.get("/churn-trend")
-def get_churn_trend():
-    """Get churn rate trend over time"""
-    return {
-        "trend": [
-            {"month": "Jan", "rate": 25.2},
-            {"month": "Feb", "rate": 23.8},
-            {"month": "Mar", "rate": 22.1},
-            {"month": "Apr", "rate": 24.5},
-            {"month": "May", "rate": 23.4},
-            {"month": "Jun", "rate": 21.9}
-        ]
-    }
\ No newline at end of file
+def get_churn_trend(granularity: str = "quarter", contract: str | None = None,
+                    tenure_from: int | None = None, tenure_to: int | None = None):
+    """Churn rate per tenure cohort from the precomputed rollups"""
+    try:
+        return churn_trend(granularity, contract, tenure_from, tenure_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TrendUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
\ No newline at end of file
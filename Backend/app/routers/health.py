@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Response
+from ..services.warmup import warmup
+
+router = APIRouter(tags=["health"])
+
+@router.get("/ready")
+async def ready(response: Response):
+    """Readiness probe: 200 once the required components are warm, 503 before"""
+    # without WARMUP_ON_STARTUP the first probe starts the warm-up; later probes
+    # retry required components that failed, with backoff
+    warmup.start()
+    report = warmup.report()
+    if not report["ready"]:
+        response.status_code = 503
+    return report
+
+@router.get("/db-pools")
+def db_pools():
+    """Occupancy of the shared database connection pools"""
+    from db.engine import pool_stats
+    return pool_stats()
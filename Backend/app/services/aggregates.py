@@ -0,0 +1,194 @@
+import asyncio
+import threading
+import time
+import typing as t
+from contextlib import contextmanager
+
+from ..utils.settings import settings
+
+class AggregateStore:
+    """
+    Running counts and sums behind ``/dashboard-stats``. Import and rescore
+    jobs apply the exact per-chunk change they made to ``customers`` /
+    ``churn_scores``, so reads are O(1) whatever the table size. ``reconcile``
+    replaces the totals with a full recount; it is skipped while a writer is
+    running, since a recount taken mid-job cannot be told apart from the
+    deltas that job applies afterwards.
+    """
+
+    FIELDS = ("customers", "churned", "monthly_charges", "scored", "proba_sum", "high_risk")
+
+    def __init__(self):
+        self._totals = dict.fromkeys(self.FIELDS, 0.0)
+        self._lock = threading.Lock()
+        self._writers = 0
+        self._epoch = 0                 # bumped whenever a writer starts
+        self.loaded = False
+        self.updated_at: float | None = None
+        self.reconciled_at: float | None = None
+        self.last_drift: dict[str, float] = {}
+        self.deltas_applied = 0
+
+    @contextmanager
+    def writing(self) -> t.Iterator[None]:
+        with self._lock:
+            self._writers += 1
+            self._epoch += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._writers -= 1
+
+    def apply(self, delta: dict[str, float] | None) -> None:
+        if not delta:
+            return
+        with self._lock:
+            for name, value in delta.items():
+                self._totals[name] += value
+            self.deltas_applied += 1
+            self.updated_at = time.time()
+
+    def reconcile(self, recount: t.Callable[[], dict[str, float]]) -> bool:
+        """Replace the totals with ``recount()``; False if a writer ran meanwhile."""
+        with self._lock:
+            if self._writers:
+                return False
+            epoch = self._epoch
+        totals = recount()
+        with self._lock:
+            if self._writers or self._epoch != epoch:
+                return False
+            if self.loaded:
+                # what the incremental updates missed, e.g. a CLI import from another process
+                drift = {k: totals[k] - self._totals[k] for k in self.FIELDS}
+                # float sums pick up rounding noise, only real misses count
+                self.last_drift = {k: d for k, d in drift.items() if abs(d) > 1e-6 * max(1.0, abs(totals[k]))}
+            self._totals = {k: float(totals[k]) for k in self.FIELDS}
+            self.loaded = True
+            self.updated_at = self.reconciled_at = time.time()
+        return True
+
+    def totals(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._totals)
+
+aggregates = AggregateStore()
+_status: dict[str, t.Any] = {"last_attempt": None, "last_error": None, "views_error": None}
+
+class TrendUnavailable(RuntimeError):
+    """The tenure rollup cannot be read: database down or view not created yet."""
+
+def _recount() -> dict[str, float]:
+    """Read-only: a table that does not exist yet counts as empty."""
+    from sqlalchemy import text
+    from core.bulk_score import SCORES_TABLE, score_totals
+    from core.import_data import CUSTOMER_TOTALS, CUSTOMERS_TABLE
+    from db.engine import get_engine
+    from db.schema import totals_sql
+    out = {}
+    with get_engine().connect() as conn:
+        for table, exprs in ((CUSTOMERS_TABLE, CUSTOMER_TOTALS),
+                             (SCORES_TABLE, score_totals(settings.HIGH_RISK_THRESHOLD))):
+            if conn.execute(text("SELECT to_regclass(:table)"), {"table": table}).scalar() is None:
+                out.update(dict.fromkeys(exprs, 0.0))
+                continue
+            row = conn.execute(text(totals_sql(table, exprs))).one()
+            out.update({name: float(value or 0) for name, value in zip(exprs, row)})
+    return out
+
+def reconcile() -> bool:
+    """Full recount from Postgres (blocking)."""
+    _status["last_attempt"] = time.time()
+    try:
+        done = aggregates.reconcile(_recount)
+        _status["last_error"] = None
+        return done
+    except Exception as e:
+        _status["last_error"] = f"{type(e).__name__}: {e}"
+        return False
+
+async def reconcile_loop(interval: float) -> None:
+    """Load the totals at startup, then recount every ``interval`` seconds."""
+    while True:
+        await asyncio.to_thread(reconcile)
+        await asyncio.sleep(interval)
+
+def dashboard_stats() -> dict:
+    if not aggregates.loaded:
+        # no reconcile loop in this process (or it has not succeeded yet): try inline, rate-limited
+        last = _status["last_attempt"]
+        if last is None or time.time() - last > settings.AGGREGATES_RETRY_SECONDS:
+            reconcile()
+    a = aggregates.totals()
+    customers, scored = a["customers"], a["scored"]
+    return {
+        "total_customers": int(customers),
+        "churned_customers": int(a["churned"]),
+        "churn_rate": round(100.0 * a["churned"] / customers, 1) if customers else 0.0,
+        "avg_monthly_charges": round(a["monthly_charges"] / customers, 2) if customers else 0.0,
+        "scored_customers": int(scored),
+        "avg_churn_proba": round(a["proba_sum"] / scored, 4) if scored else 0.0,
+        "high_risk_customers": int(a["high_risk"]),
+        "high_risk_threshold": settings.HIGH_RISK_THRESHOLD,
+        "loaded": aggregates.loaded,
+        "updated_at": aggregates.updated_at,
+        "reconciled_at": aggregates.reconciled_at,
+    }
+
+def ensure_views() -> None:
+    """
+    Create missing churn indexes and views and migrate ``churn_scores``
+    (startup; scoring jobs do the same). The read paths only SELECT.
+    """
+    from core.bulk_score import ensure_scores_table
+    from db.engine import get_engine
+    from db.schema import ensure_schema
+    # DDL takes ACCESS EXCLUSIVE locks: no statement timeout, but never inside a request
+    try:
+        engine = get_engine(statement_timeout_ms=0)
+        ensure_scores_table(engine)
+        ensure_schema(engine)
+        _status["views_error"] = None
+    except Exception as e:
+        _status["views_error"] = f"{type(e).__name__}: {e}"
+
+def churn_trend(granularity: str = "quarter", contract: str | None = None,
+                tenure_from: int | None = None, tenure_to: int | None = None) -> dict:
+    """Churn per tenure cohort, read from the rollup view (refreshed after every import)."""
+    from sqlalchemy.exc import SQLAlchemyError
+    from db.engine import get_engine
+    from db.schema import TREND_VIEW, tenure_trend
+    try:
+        rows = tenure_trend(get_engine(), granularity, contract, tenure_from, tenure_to)
+    except SQLAlchemyError as e:
+        raise TrendUnavailable(
+            f"Churn trend unavailable: cannot read {TREND_VIEW} ({type(e).__name__}); "
+            "it is created at startup and by imports (python db/schema.py --refresh)"
+        ) from e
+    return {
+        "granularity": granularity,
+        "contract": contract,
+        "trend": [
+            {
+                "cohort": f"{r['tenure_from']}-{r['tenure_to']}",
+                "tenure_from": r["tenure_from"],
+                "tenure_to": r["tenure_to"],
+                "customers": int(r["customers"]),
+                "churned": int(r["churned"]),
+                "rate": round(r["churn_rate"], 1),
+            }
+            for r in rows
+        ],
+    }
+
+def aggregate_info() -> dict:
+    return {
+        "loaded": aggregates.loaded,
+        "totals": aggregates.totals(),
+        "deltas_applied": aggregates.deltas_applied,
+        "updated_at": aggregates.updated_at,
+        "reconciled_at": aggregates.reconciled_at,
+        "last_drift": aggregates.last_drift,
+        **_status,
+    }
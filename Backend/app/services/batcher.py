@@ -0,0 +1,117 @@
+import asyncio
+import time
+import typing as t
+from collections import deque
+
+import numpy as np
+
+class MicroBatcher:
+    """
+    Collects concurrent single-row scoring requests for up to ``max_wait_ms``
+    (or until ``max_batch_size`` rows are queued), scores them with one
+    vectorized ``score_fn(X, ctx)`` call and resolves each waiting request.
+    Rows submitted with different ``ctx`` objects (e.g. two model versions
+    during a hot-swap) are scored in separate calls.
+    """
+
+    def __init__(self, score_fn: t.Callable[[np.ndarray, t.Any], np.ndarray],
+                 max_batch_size: int = 64, max_wait_ms: float = 2.0):
+        self.score_fn = score_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.batches = self.requests = self.max_seen = 0
+        self._wait_sum = 0.0
+        self._recent_sizes: deque[int] = deque(maxlen=1000)
+        self._recent_waits: deque[float] = deque(maxlen=1000)
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def submit(self, row: np.ndarray, ctx: t.Any = None) -> float:
+        self._ensure_started()
+        fut = self._loop.create_future()
+        self._queue.put_nowait((row, ctx, fut, time.perf_counter()))
+        return await fut
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, RuntimeError):
+                # RuntimeError: task belongs to a loop that is already closed
+                pass
+            self._task = None
+
+    async def _collect(self) -> list[tuple]:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            now = time.perf_counter()
+            for _, _, _, enqueued in batch:
+                self._recent_waits.append(now - enqueued)
+                self._wait_sum += now - enqueued
+            self.batches += 1
+            self.requests += len(batch)
+            self.max_seen = max(self.max_seen, len(batch))
+            self._recent_sizes.append(len(batch))
+
+            groups: dict[int, list[tuple]] = {}
+            for item in batch:
+                groups.setdefault(id(item[1]), []).append(item)
+            for items in groups.values():
+                self._score(items)
+
+    def _score(self, items: list[tuple]) -> None:
+        try:
+            scores = self.score_fn(np.vstack([row for row, _, _, _ in items]), items[0][1])
+        except Exception as e:
+            for _, _, fut, _ in items:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, _, fut, _), score in zip(items, scores):
+            # a client that disconnected leaves a cancelled future behind
+            if not fut.done():
+                fut.set_result(float(score))
+
+    def stats(self) -> dict:
+        sizes = np.array(self._recent_sizes or [0])
+        waits_ms = np.array(self._recent_waits or [0.0]) * 1000.0
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "max_observed_batch_size": self.max_seen,
+            "recent_batch_size_p50": float(np.percentile(sizes, 50)),
+            "recent_batch_size_p95": float(np.percentile(sizes, 95)),
+            "mean_queue_wait_ms": self._wait_sum * 1000.0 / self.requests if self.requests else 0.0,
+            "recent_queue_wait_p95_ms": float(np.percentile(waits_ms, 95)),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
@@ -0,0 +1,166 @@
+import asyncio
+import importlib.util
+import inspect
+import time
+import typing as t
+
+from ..utils.settings import settings
+from . import model
+
+class SkipComponent(Exception):
+    """Raised by a warm-up step that does not apply to this deployment."""
+
+class Component:
+    def __init__(self, name: str, fn: t.Callable[[], t.Any]):
+        self.name = name
+        self.fn = fn
+        self.status = "pending"
+        self.seconds: float | None = None
+        self.detail: str | None = None
+        # failed attempts in a row, when the next retry is due and why the last one failed
+        self.attempts = 0
+        self.retry_at: float | None = None
+        self.last_error: str | None = None
+
+class Warmup:
+    """
+    Loads the heavy components of a worker in parallel at startup and keeps
+    their status for ``/ready``. Only components in READY_REQUIRES gate
+    readiness; the others are reported but may fail or be skipped. A required
+    component that failed is loaded again by a later ``start()`` (every
+    ``/ready`` probe), at most once per backoff period, which doubles with
+    each failure up to WARMUP_RETRY_MAX_SECONDS.
+    """
+
+    def __init__(self, components: list[Component]):
+        self.components = {c.name: c for c in components}
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.task: asyncio.Task | None = None
+        self.retries: dict[str, asyncio.Task] = {}
+
+    def start(self) -> asyncio.Task:
+        """
+        Run the warm-up in the background, once per worker (again only if
+        cancelled); once it has finished, retry the failed required
+        components whose backoff has expired.
+        """
+        if self.task is None or self.task.cancelled():
+            self.task = asyncio.create_task(self.run())
+        elif self.task.done():
+            self.retry_failed()
+        return self.task
+
+    def retry_failed(self) -> None:
+        now = time.monotonic()
+        for name in settings.READY_REQUIRES:
+            c = self.components.get(name)
+            if c is None or c.status != "failed" or (c.retry_at or 0) > now:
+                continue
+            running = self.retries.get(name)
+            if running is None or running.done():
+                self.retries[name] = asyncio.create_task(self._run_one(c))
+
+    def cancel(self) -> None:
+        for task in (self.task, *self.retries.values()):
+            if task is not None and not task.done():
+                task.cancel()
+
+    async def run(self) -> None:
+        self.started_at, self.finished_at = time.time(), None
+        for c in self.components.values():
+            c.status, c.seconds, c.detail = "pending", None, None
+            c.attempts, c.retry_at, c.last_error = 0, None, None
+        await asyncio.gather(*(self._run_one(c) for c in self.components.values()))
+        self.finished_at = time.time()
+
+    async def _run_one(self, c: Component) -> None:
+        c.status, c.detail = "loading", None
+        start = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(c.fn):
+                await c.fn()
+            else:
+                # loaders block on disk/CPU, keep them off the event loop
+                await asyncio.to_thread(c.fn)
+            c.status, c.attempts, c.retry_at = "ready", 0, None
+        except SkipComponent as e:
+            c.status, c.detail = "skipped", str(e)
+        except Exception as e:
+            c.status = "failed"
+            c.detail = c.last_error = f"{type(e).__name__}: {e}"
+            c.attempts += 1
+            backoff = min(settings.WARMUP_RETRY_SECONDS * 2 ** (c.attempts - 1),
+                          settings.WARMUP_RETRY_MAX_SECONDS)
+            c.retry_at = time.monotonic() + backoff
+        c.seconds = time.perf_counter() - start
+
+    @property
+    def ready(self) -> bool:
+        return all(
+            name in self.components and self.components[name].status == "ready"
+            for name in settings.READY_REQUIRES
+        )
+
+    def report(self) -> dict:
+        now = time.monotonic()
+        return {
+            "ready": self.ready,
+            "required": list(settings.READY_REQUIRES),
+            "warmup_seconds": (self.finished_at - self.started_at)
+                              if self.started_at and self.finished_at else None,
+            "components": {
+                c.name: {
+                    "status": c.status, "seconds": c.seconds, "detail": c.detail,
+                    "attempts": c.attempts, "last_error": c.last_error,
+                    "retry_in": max(0.0, c.retry_at - now)
+                                if c.status == "failed" and c.retry_at is not None else None,
+                }
+                for c in self.components.values()
+            },
+        }
+
+def _warm_model():
+    m = model._active_model()
+    # first call pays for lazy numpy/sklearn initialisation
+    m.predict_proba(m.encode({}))
+    if settings.SCORING_BACKEND == "cascade":
+        model._ensure_rules()
+    elif settings.SCORING_BACKEND == "table":
+        model._ensure_table(m)
+
+def _warm_embedder():
+    from db.vector_db import get_embedder
+    get_embedder().encode(["warm-up"])
+
+def _warm_vector_store():
+    if not settings.VECTOR_DB_PATH:
+        raise SkipComponent("VECTOR_DB_PATH is not set")
+    model._ensure_vector_db().collection.count()
+
+def _warm_database():
+    from sqlalchemy import text
+    from db.engine import get_engine
+    with get_engine().connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+async def _warm_database_async():
+    # runs on the event loop: asyncpg connections belong to the loop that opened them
+    from sqlalchemy import text
+    if importlib.util.find_spec("asyncpg") is None:
+        raise SkipComponent("async database driver unavailable: asyncpg is not installed")
+    try:
+        from db.engine import get_async_engine
+        engine = get_async_engine()
+    except ImportError as e:
+        raise SkipComponent(f"async database driver unavailable: {e}")
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+warmup = Warmup([
+    Component("model", _warm_model),
+    Component("embedder", _warm_embedder),
+    Component("vector_store", _warm_vector_store),
+    Component("database", _warm_database),
+    Component("database_async", _warm_database_async),
+])
@@ -15,4 +15,83 @@ class Settings(BaseSettings):
     VECTOR_DB_PATH: str | None = None   
     TOP_K: int = 4
 
+    # In-process churn model; the LLM is only used when SCORING_BACKEND is "llm" or "cascade"
+    MODEL_PATH: str = "data/models/churn_model.joblib"
+    TRAIN_DATA_PATH: str = "data/raw/Telco-Customer-Churn.csv"
+    MODEL_KIND: str = "logistic"
+    SCORING_BACKEND: str = "model"
+    EXPLAIN_BACKEND: str = "model"
+
+    # SCORING_BACKEND="cascade": calibrated rules -> model -> LLM; each tier answers
+    # when its probability is outside its band, otherwise the next tier is asked
+    CASCADE_RULES_BAND: list[float] = [0.1, 0.9]
+    CASCADE_MODEL_BAND: list[float] = [0.45, 0.55]
+
+    # SCORING_BACKEND="table": probabilities from a lookup table compiled from the
+    # active model over the binned feature lattice (see core/lookup_table.py), in a
+    # background thread; the model serves meanwhile. Only models whose table passes
+    # the gate below are served from it, which neither shipped MODEL_KIND does
+    # (logistic: exact but slower; gradient_boosting: too inaccurate)
+    LOOKUP_TABLE_MAX_CELLS: int = 1 << 21
+    LOOKUP_TABLE_INTERPOLATE: bool = True
+    # The table only serves if, on the training data, it stays within these bounds of
+    # the model (and, with LOOKUP_TABLE_REQUIRE_FASTER, beats its per-row latency);
+    # otherwise the model scores and the rejected report is logged
+    LOOKUP_TABLE_MAX_ABS_ERROR: float = 0.02
+    LOOKUP_TABLE_MIN_AGREEMENT: float = 0.995
+    LOOKUP_TABLE_REQUIRE_FASTER: bool = True
+
+    # Versioned artifacts (<MODEL_REGISTRY_PATH>/<version>/model.joblib + CURRENT);
+    # an empty registry is seeded from MODEL_PATH. Workers poll CURRENT every
+    # MODEL_WATCH_INTERVAL seconds (0 disables) and keep MODEL_KEEP_WARM models loaded.
+    MODEL_REGISTRY_PATH: str = "data/models"
+    MODEL_WATCH_INTERVAL: float = 5.0
+    MODEL_KEEP_WARM: int = 3
+
+    # Prediction cache (LRU + TTL); size 0 disables it
+    PREDICTION_CACHE_SIZE: int = 10_000
+    PREDICTION_CACHE_TTL: float = 3600.0
+
+    # Micro-batching of concurrent /predict calls; BATCH_MAX_SIZE=1 disables it
+    BATCH_MAX_SIZE: int = 64
+    BATCH_MAX_WAIT_MS: float = 2.0
+
+    # Persistent LLM completion cache; None disables it
+    LLM_CACHE_PATH: str | None = "data/cache/llm_completions.sqlite3"
+
+    # Structured LLM answers stop at the first valid JSON object; invalid ones are
+    # retried while the token budget (shared across attempts) lasts
+    LLM_JSON_MAX_TOKENS: int = 256
+    LLM_JSON_ATTEMPTS: int = 2
+
+    # Rows per server-side cursor fetch / COPY batch in bulk rescoring
+    BULK_SCORE_CHUNK_SIZE: int = 10_000
+
+    # CSV upserted into customers by POST /api/churn/import-jobs
+    IMPORT_DATA_PATH: str = "data/raw/Telco-Customer-Churn.csv"
+    IMPORT_CHUNK_SIZE: int = 50_000
+
+    # /dashboard-stats totals: updated by import/rescore jobs, fully recounted every
+    # AGGREGATES_RECONCILE_INTERVAL seconds (0 disables the loop; the first read then
+    # loads them, retrying at most every AGGREGATES_RETRY_SECONDS)
+    AGGREGATES_RECONCILE_INTERVAL: float = 300.0
+    AGGREGATES_RETRY_SECONDS: float = 30.0
+    HIGH_RISK_THRESHOLD: float = 0.7
+
+    # Create missing churn indexes and materialized views (db/schema.py) and migrate
+    # churn_scores at startup; /churn-trend and the aggregate recount only read them
+    ENSURE_VIEWS_ON_STARTUP: bool = True
+
+    # Startup warm-up; /ready returns 200 once every component listed here is loaded.
+    # With WARMUP_ON_STARTUP off the first /ready call starts the warm-up instead
+    WARMUP_ON_STARTUP: bool = True
+    READY_REQUIRES: list[str] = ["model"]
+    # A failed required component is loaded again on a later /ready call, waiting
+    # WARMUP_RETRY_SECONDS after the first failure and twice as long after each next one
+    WARMUP_RETRY_SECONDS: float = 1.0
+    WARMUP_RETRY_MAX_SECONDS: float = 60.0
+
+    # Chat / call-center answers: "canned" templates or "llm" (async Ollama + RAG)
+    ASSISTANT_BACKEND: str = "canned"
+
 settings = Settings()
@@ -0,0 +1,28 @@
+import json
+import time
+import typing as t
+
+def sse_event(event: str, data: t.Any) -> str:
+    """One Server-Sent Events frame with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+class StreamTimer:
+    """Time-to-first-token and total duration of a streamed answer."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first: float | None = None
+        self.chunks = 0
+
+    def tick(self) -> None:
+        if self.first is None:
+            self.first = time.perf_counter()
+        self.chunks += 1
+
+    def summary(self) -> dict:
+        now = time.perf_counter()
+        return {
+            "first_token_ms": (self.first - self.start) * 1000.0 if self.first is not None else None,
+            "total_ms": (now - self.start) * 1000.0,
+            "chunks": self.chunks,
+        }
@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# the backend (``app``) and the shared packages at the repository root (``core``, ``db``);
+# the backend goes first so ``app`` is never the demo package at the root
+backend_root = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_root))
+sys.path.append(str(backend_root.parent))
+
+
+@pytest.fixture(scope="session")
+def telco_frame():
+    from core.churn_model import load_dataset
+    # parsed directly: the snapshot cache path is relative to the working directory
+    return load_dataset(backend_root.parent / "data" / "raw" / "Telco-Customer-Churn.csv", snapshot=False)
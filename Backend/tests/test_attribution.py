@@ -0,0 +1,97 @@
+import itertools
+import math
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier
+
+from app.services.attribution import attribute
+from core.churn_model import ChurnModel, _build_estimator
+from core.feature_encoder import TARGET_COLUMN, FeatureEncoder
+
+
+def _fit(frame, kind, estimator, version):
+    encoder = FeatureEncoder.from_frame(frame)
+    X = encoder.transform(frame)
+    y = (frame[TARGET_COLUMN] == "Yes").astype(int).to_numpy()
+    return ChurnModel(estimator.fit(X, y), kind, encoder, version, feature_means=X.mean(axis=0, dtype=np.float64)), X
+
+
+@pytest.fixture(scope="module")
+def logistic(telco_frame):
+    return _fit(telco_frame, "logistic", _build_estimator("logistic", 0), "test-logistic")
+
+
+@pytest.fixture(scope="module")
+def small_ensemble(telco_frame):
+    # few shallow trees keep the features they split on few enough to enumerate every coalition
+    estimator = GradientBoostingClassifier(n_estimators=4, max_depth=3, random_state=0)
+    return _fit(telco_frame, "gradient_boosting", estimator, "test-gradient-boosting-small")
+
+
+def _expected_value(tree, x, coalition, node=0):
+    """Path-dependent E[tree(x) | x_S]: features outside S follow both children, weighted by cover."""
+    left, right = tree.children_left[node], tree.children_right[node]
+    if left == right:
+        return float(tree.value[node].ravel()[0])
+    f = tree.feature[node]
+    if f in coalition:
+        return _expected_value(tree, x, coalition, left if x[f] <= tree.threshold[node] else right)
+    cover = tree.weighted_n_node_samples
+    return (cover[left] * _expected_value(tree, x, coalition, left)
+            + cover[right] * _expected_value(tree, x, coalition, right)) / cover[node]
+
+
+def _brute_force_shapley(model, x):
+    est = model.estimator
+    trees = [e.tree_ for e in est.estimators_[:, 0]]
+    x = x.astype(np.float32)  # the trees compare float32 inputs against their thresholds
+    # the prior's log-odds: the raw score minus the trees' share, at any input
+    x0 = np.zeros((1, len(x)))
+    init = float(est.decision_function(x0)[0] - est.learning_rate * sum(tree.predict(x0.astype(np.float32))[0, 0]
+                                                                         for tree in trees))
+
+    def value(coalition):
+        return init + est.learning_rate * sum(_expected_value(tree, x, coalition) for tree in trees)
+
+    # features no tree splits on are null players with zero attribution
+    used = sorted({int(f) for tree in trees for f in tree.feature if f >= 0})
+    phi = np.zeros(len(x))
+    d = len(used)
+    for i in used:
+        others = [f for f in used if f != i]
+        for size in range(d):
+            weight = math.factorial(size) * math.factorial(d - size - 1) / math.factorial(d)
+            for subset in itertools.combinations(others, size):
+                phi[i] += weight * (value({*subset, i}) - value(set(subset)))
+    return value(set()), phi
+
+
+def test_tree_shap_matches_brute_force_shapley(small_ensemble):
+    model, X = small_ensemble
+    rows = X[np.random.default_rng(0).choice(len(X), 12, replace=False)]
+    base, phi = attribute(model, rows)
+    for x, got in zip(rows, phi):
+        expected_base, expected = _brute_force_shapley(model, x)
+        assert base == pytest.approx(expected_base, abs=1e-9)
+        np.testing.assert_allclose(got, expected, atol=1e-9)
+
+
+def test_tree_attribution_is_additive(small_ensemble):
+    model, X = small_ensemble
+    base, phi = attribute(model, X[:500])
+    np.testing.assert_allclose(base + phi.sum(axis=1), model.decision_function(X[:500]), atol=1e-9)
+
+
+def test_linear_attribution_is_additive(logistic):
+    model, X = logistic
+    base, phi = attribute(model, X)
+    assert phi.shape == X.shape
+    np.testing.assert_allclose(base + phi.sum(axis=1), model.decision_function(X), atol=1e-9)
+
+
+def test_linear_attribution_is_zero_at_the_training_means(logistic):
+    model, _ = logistic
+    base, phi = attribute(model, model.feature_means[None, :])
+    np.testing.assert_allclose(phi, 0.0, atol=1e-12)
+    assert base == pytest.approx(float(model.decision_function(model.feature_means)[0]))
@@ -0,0 +1,50 @@
+from app.services.cache import PredictionCache, prediction_key
+
+FEATURES = {"tenure": 12, "MonthlyCharges": 70.35, "Contract": "Month-to-month", "SeniorCitizen": True}
+
+
+def key(features=FEATURES, vector=None, context=None, version="logistic-0123456789"):
+    return prediction_key(vector, features, context, version)
+
+
+def test_key_is_deterministic_and_order_independent():
+    assert key() == key(dict(reversed(list(FEATURES.items()))))
+    assert len(key()) == 64
+
+
+def test_key_folds_column_spellings():
+    assert key() == key({"Tenure": 12, "monthly_charges": 70.35, "contract": "Month-to-month",
+                         "Senior Citizen": True})
+
+
+def test_key_folds_numeric_spellings():
+    assert key() == key({**FEATURES, "tenure": 12.0}) == key({**FEATURES, "tenure": " 12.0"})
+
+
+def test_key_folds_booleans_to_yes_no():
+    assert key({**FEATURES, "Partner": True}) == key({**FEATURES, "Partner": "Yes"})
+    assert key({**FEATURES, "Partner": False}) == key({**FEATURES, "Partner": "No"})
+
+
+def test_key_keeps_categorical_spellings_the_encoder_rejects():
+    assert key() != key({**FEATURES, "Contract": "month-to-month"})
+
+
+def test_key_strips_blank_context():
+    assert key(context=None) == key(context="") == key(context="  ")
+    assert key(context=" VIP ") == key(context="VIP") != key()
+
+
+def test_key_separates_models_and_inputs():
+    assert key() != key(version="gradient_boosting-0123456789")
+    assert key() != key({**FEATURES, "tenure": 13})
+    assert key(None, vector=[1, 2.5]) == key(None, vector=[1.0, 2.5]) != key(None, vector=[2.5, 1.0])
+
+
+def test_cache_hit_miss_and_eviction():
+    cache = PredictionCache(maxsize=1)
+    cache.put(key(), {"churn_proba": 0.3})
+    assert cache.get(key()) == {"churn_proba": 0.3}
+    cache.put(key(version="other"), {"churn_proba": 0.4})
+    assert cache.get(key()) is None
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 1)
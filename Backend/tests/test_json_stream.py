@@ -0,0 +1,106 @@
+import pytest
+
+from core.json_stream import JSONObjectScanner, first_json_object
+
+
+def test_quoted_brace_in_prose_does_not_hide_the_object():
+    assert first_json_object('He said "{" then {"churn_proba": 0.1}') == {"churn_proba": 0.1}
+
+
+def test_unmatched_brace_in_prose_does_not_hide_the_object():
+    assert first_json_object('Use {name to fill in: {"churn_proba": 0.4, "reason": "tenure"}') \
+        == {"churn_proba": 0.4, "reason": "tenure"}
+
+
+def test_placeholder_before_object_is_skipped():
+    assert first_json_object('Format: {answer}. Answer: {"churn_proba": 0.9}') == {"churn_proba": 0.9}
+
+
+def test_quoted_brace_streamed_char_by_char():
+    scanner = JSONObjectScanner()
+    text = 'He said "{" then {"churn_proba": 0.1} and more prose'
+    found = [(i, obj) for i, ch in enumerate(text) if (obj := scanner.feed(ch)) is not None]
+    assert found == [(text.index("}"), {"churn_proba": 0.1})]
+
+
+@pytest.mark.parametrize("obj", [
+    '{"a": "x \\" {y", "b": [1, -2.5e+3, true, false, null], "c": {"d": "\\u00e9"}}',
+    '{"churn_proba": 0.25, "factors": ["Month-to-month", "{fiber}"]}',
+])
+def test_object_survives_every_cut_point(obj):
+    """No prefix of a valid object counts as a dead candidate."""
+    scanner = JSONObjectScanner()
+    for ch in obj[:-1]:
+        assert scanner.feed(ch) is None
+        assert scanner.pending
+    assert scanner.feed(obj[-1]) is not None
+
+
+def test_object_returned_on_the_chunk_that_closes_it():
+    scanner = JSONObjectScanner()
+    chunks = ["Sure! Here is the answer: ", '{"churn_proba": ', "0.42, ", '"reason": "short tenure"}', " Hope it helps"]
+    results = [scanner.feed(c) for c in chunks[:4]]
+    assert results == [None, None, None, {"churn_proba": 0.42, "reason": "short tenure"}]
+    assert scanner.chunks == 4
+    assert not scanner.pending
+
+
+def test_open_object_is_pending_until_closed():
+    scanner = JSONObjectScanner()
+    assert scanner.feed('{"churn_proba": 0.4, "reason": "a } in a string') is None
+    assert scanner.pending
+    assert scanner.feed('"}') == {"churn_proba": 0.4, "reason": "a } in a string"}
+
+
+@pytest.mark.parametrize("text", ["", None, "no json here", "[1, 2, 3]", "{not json}", '{"unclosed": 1'])
+def test_first_json_object_raises_without_an_object(text):
+    with pytest.raises(ValueError):
+        first_json_object(text)
+
+
+class _FakeClient:
+    """ollama.Client stand-in streaming canned chunks and recording how many were consumed."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.consumed, self.closed = [], []
+
+    def chat(self, model, messages, options, stream):
+        chunks = self.answers.pop(0)
+
+        def gen():
+            try:
+                for c in chunks:
+                    self.consumed.append(c)
+                    yield {"message": {"content": c}}
+            finally:
+                self.closed.append(True)
+        return gen()
+
+
+def _expert(client, **kwargs):
+    from core.ollama_handle import OllamaChurnExpert
+    expert = OllamaChurnExpert(cache_path=None, **kwargs)
+    expert.client = client
+    return expert
+
+
+def test_ask_json_stops_generation_at_the_object():
+    client = _FakeClient(["Here: ", '{"churn_proba": 0.2}', " and a long", " explanation", " ..."])
+    assert _expert(client).ask_json("score") == {"churn_proba": 0.2}
+    assert client.consumed == ["Here: ", '{"churn_proba": 0.2}']
+    assert client.closed == [True]
+
+
+def test_ask_json_retries_invalid_answers_within_the_token_budget():
+    def validate(obj):
+        if not 0 <= obj.get("churn_proba", -1) <= 1:
+            raise ValueError("churn_proba must be in [0, 1]")
+
+    client = _FakeClient(['{"churn_proba": 7}'], ["no json at all"])
+    with pytest.raises(ValueError, match="no complete JSON object|empty answer"):
+        _expert(client, json_attempts=2).ask_json("score", validate=validate)
+    assert client.answers == []
+
+    client = _FakeClient(['{"churn_proba": 7}'], ['{"churn_proba": 0.7}'])
+    assert _expert(client).ask_json("score", validate=validate) == {"churn_proba": 0.7}
@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import time
@@ -82,14 +82,9 @@ def predict_churn(req: ChurnRequest):
 @app.get("/api/churn/dashboard-stats")
 def get_dashboard_stats():
     """Статистика для дашборда"""
-    return {
-        "total_customers": 1247,
-        "churn_rate": 23.4,
-        "ai_interactions": 3421,
-        "satisfaction_score": 4.2,
-        "high_risk_customers": 156,
-        "avg_response_time": "1.2s"
-    }
+    # same aggregate store as Backend/app; loaded on the first request
+    from app.services.aggregates import dashboard_stats
+    return dashboard_stats()
 
 @app.get("/api/churn/customer-segments")
 def get_customer_segments():
@@ -103,18 +98,17 @@ def get_customer_segments():
     }
 
 @app.get("/api/churn/churn-trend")
-def get_churn_trend():
-    """Тренд churn rate"""
-    return {
-        "trend": [
-            {"month": "Jan", "rate": 25.2},
-            {"month": "Feb", "rate": 23.8},
-            {"month": "Mar", "rate": 22.1},
-            {"month": "Apr", "rate": 24.5},
-            {"month": "May", "rate": 23.4},
-            {"month": "Jun", "rate": 21.9}
-        ]
-    }
+def get_churn_trend(granularity: str = "quarter", contract: str | None = None,
+                    tenure_from: int | None = None, tenure_to: int | None = None):
+    """Тренд churn rate по когортам tenure"""
+    # same precomputed rollup as Backend/app
+    from app.services.aggregates import churn_trend, TrendUnavailable
+    try:
+        return churn_trend(granularity, contract, tenure_from, tenure_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TrendUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
 # AI Chat endpoints
 @app.post("/api/chat/message", response_model=ChatResponse)
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from ..services.model import activate_model, model_info
+
+router = APIRouter(prefix="/api/models", tags=["models"])
+
+class ActivateRequest(BaseModel):
+    version: str
+
+@router.get("")
+def list_models():
+    """Active model, warm models and every published version"""
+    return model_info()
+
+@router.post("/activate")
+async def activate(req: ActivateRequest):
+    """Hot-swap to a published version (also rollback); in-flight requests finish on the old model"""
+    try:
+        # loading an artifact reads from disk, keep it off the event loop
+        return await run_in_threadpool(activate_model, req.version)
+    except KeyError as e:
+        # unknown version
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except ValueError as e:
+        # malformed version string, e.g. a path
+        raise HTTPException(status_code=400, detail=e.args[0])
+
+@router.post("/reload")
+async def reload():
+    """Re-read the registry's CURRENT pointer and swap if it moved"""
+    return await run_in_threadpool(activate_model, None)
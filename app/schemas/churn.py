@@ -1,13 +1,28 @@
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 class ChurnRequest(BaseModel):
-    features_dict: Optional[Dict[str, float]] = None
+    # Telco columns, e.g. {"Contract": "Month-to-month", "tenure": 3}
+    features_dict: Optional[Dict[str, Any]] = None
     features_vector: Optional[List[float]] = None
     extra_context: Optional[str] = None  
     
 class ChurnResponse(BaseModel):
     churn_proba: float = Field(..., ge=0.0, le=1.0)
+    model_version: str | None = None
+
+class ChurnBatchRequest(BaseModel):
+    rows: List[ChurnRequest] = Field(..., min_length=1)
+
+class ChurnBatchItem(BaseModel):
+    index: int
+    churn_proba: float | None = Field(None, ge=0.0, le=1.0)
+    error: str | None = None
+
+class ChurnBatchResponse(BaseModel):
+    results: List[ChurnBatchItem]
+    n_scored: int
+    n_errors: int
 
 class ExplainItem(BaseModel):
     feature: str
@@ -18,4 +33,5 @@ class ExplainResponse(BaseModel):
     base_value: float | None = None
     contributions: List[ExplainItem] = []
     top_k: int = 0
-    reason: str | None = None 
+    reason: str | None = None
+    model_version: str | None = None 
@@ -0,0 +1,158 @@
+"""
+Exact, model-specific feature attributions for the in-process churn model.
+
+All values are in log-odds (decision_function) space, so for every row
+``base_value + sum(contributions) == decision_function(x)``.
+
+* logistic: ``phi_j = w_j * (x_j - mean_j)`` against the training means.
+* gradient boosting: path-dependent TreeSHAP. For one leaf the Shapley values
+  only depend on which path conditions a row satisfies, so every leaf gets a
+  precomputed table over its ``2**depth`` condition patterns and a batch of
+  rows is attributed with one gather per leaf.
+"""
+import math
+import typing as t
+import numpy as np
+
+_tree_tables: dict[str, t.Any] = {}
+
+def attribute(model, X: np.ndarray) -> tuple[float, np.ndarray]:
+    """Return ``(base_value, phi)`` with ``phi`` of shape ``(n_rows, n_features)``."""
+    X = model.check_matrix(X)
+    if model.kind == "logistic":
+        return _linear_attribution(model, X)
+    if model.kind == "gradient_boosting":
+        return _tree_attribution(model, X)
+    raise ValueError(f"No attribution method for model kind {model.kind!r}")
+
+def top_contributions(x: np.ndarray, phi: np.ndarray, names: list[str], top_k: int) -> list[dict]:
+    idx = np.argsort(-np.abs(phi), kind="stable")[:top_k]
+    return [
+        {"feature": names[i], "value": float(x[i]), "contribution": float(phi[i])}
+        for i in idx
+    ]
+
+def explain_rows(model, X: np.ndarray, top_k: int = 8) -> list[dict]:
+    """``ExplainResponse``-shaped dicts for every row of ``X``."""
+    X = model.check_matrix(X)
+    base, phi = attribute(model, X)
+    return [
+        {"base_value": base,
+         "contributions": top_contributions(X[r], phi[r], model.feature_names, top_k),
+         "top_k": int(top_k)}
+        for r in range(X.shape[0])
+    ]
+
+# ---- linear -------------------------------------------------------------------------
+
+def _linear_attribution(model, X: np.ndarray) -> tuple[float, np.ndarray]:
+    w, b = model._linear
+    means = model.feature_means if model.feature_means is not None else np.zeros_like(w)
+    return float(b + w @ means), (X - means) * w
+
+# ---- TreeSHAP -----------------------------------------------------------------------
+
+def _shapley_weights(d: int) -> np.ndarray:
+    return np.array([math.factorial(s) * math.factorial(d - s - 1) / math.factorial(d) for s in range(d)])
+
+def _leaf_table(v: float, zero: np.ndarray) -> np.ndarray:
+    """
+    Shapley values of ``g(S) = v * prod_{j in S} o_j * prod_{j not in S} z_j``
+    for every binary pattern ``o`` of the leaf's ``d`` path features.
+    """
+    d = len(zero)
+    weights = _shapley_weights(d)
+    table = np.zeros((1 << d, d))
+    for pattern in range(1 << d):
+        one = np.array([(pattern >> k) & 1 for k in range(d)], dtype=float)
+        for k in range(d):
+            # coefficients of prod_{j != k} (z_j + o_j * t): c[s] sums over subsets of size s
+            coeffs = np.ones(1)
+            for j in range(d):
+                if j != k:
+                    coeffs = np.convolve(coeffs, [zero[j], one[j]])
+            table[pattern, k] = v * (one[k] - zero[k]) * np.dot(weights, coeffs)
+    return table
+
+def _compile_tree(tree) -> tuple[float, list[tuple]]:
+    """Expected value of the tree and, per leaf, its path conditions and pattern table."""
+    left, right = tree.children_left, tree.children_right
+    cover = tree.weighted_n_node_samples
+    leaves = []
+    expected = 0.0
+
+    def walk(node: int, path: list[tuple[int, float, bool]], zero: dict[int, float]):
+        nonlocal expected
+        if left[node] == right[node]:
+            v = float(tree.value[node].ravel()[0])
+            expected += v * cover[node] / cover[0]
+            feats = list(zero)
+            if feats:
+                leaves.append((feats, path, _leaf_table(v, np.array([zero[f] for f in feats]))))
+            return
+        f, thr = int(tree.feature[node]), float(tree.threshold[node])
+        for child, goes_left in ((left[node], True), (right[node], False)):
+            z = dict(zero)
+            z[f] = z.get(f, 1.0) * cover[child] / cover[node]
+            walk(child, path + [(f, thr, goes_left)], z)
+
+    walk(0, [], {})
+    return expected, leaves
+
+class _FlatLeaves(t.NamedTuple):
+    """Leaves of the whole ensemble padded to the maximum path depth ``D``."""
+    cond_feat: np.ndarray   # (L, D) feature tested by each path condition
+    cond_thr: np.ndarray    # (L, D) threshold, +inf on padding so it always holds
+    cond_left: np.ndarray   # (L, D) whether the path goes left at that condition
+    cond_bit: np.ndarray    # (L, D) pattern bit of the condition's feature
+    leaf_feat: np.ndarray   # (L, D) unique path features, padded with 0
+    tables: np.ndarray      # (L, 2**D, D) Shapley values per pattern, zero on padding
+
+def _flatten(leaves: list[tuple]) -> _FlatLeaves:
+    depth = max((len(path) for _, path, _ in leaves), default=1)
+    n = len(leaves)
+    flat = _FlatLeaves(
+        np.zeros((n, depth), dtype=np.intp), np.full((n, depth), np.inf),
+        np.ones((n, depth), dtype=bool), np.zeros((n, depth), dtype=np.intp),
+        np.zeros((n, depth), dtype=np.intp), np.zeros((n, 1 << depth, depth)),
+    )
+    for i, (feats, path, table) in enumerate(leaves):
+        slot = {f: k for k, f in enumerate(feats)}
+        for c, (f, thr, goes_left) in enumerate(path):
+            flat.cond_feat[i, c], flat.cond_thr[i, c] = f, thr
+            flat.cond_left[i, c], flat.cond_bit[i, c] = goes_left, 1 << slot[f]
+        flat.leaf_feat[i, :len(feats)] = feats
+        # patterns only use the low len(feats) bits, padding slots stay zero
+        flat.tables[i, :table.shape[0], :table.shape[1]] = table
+    return flat
+
+def _compiled_ensemble(model) -> tuple[float, float, _FlatLeaves]:
+    cached = _tree_tables.get(model.version)
+    if cached is None:
+        est = model.estimator
+        lr = float(est.learning_rate)
+        trees = [_compile_tree(e.tree_) for e in est.estimators_[:, 0]]
+        x0 = np.zeros((1, model.n_features))
+        init = float(est.decision_function(x0)[0] - lr * sum(e.predict(x0)[0] for e in est.estimators_[:, 0]))
+        base = init + lr * sum(expected for expected, _ in trees)
+        flat = _flatten([leaf for _, leaves in trees for leaf in leaves])
+        cached = _tree_tables[model.version] = (base, lr, flat)
+    return cached
+
+def _tree_attribution(model, X: np.ndarray, chunk_rows: int = 256) -> tuple[float, np.ndarray]:
+    base, lr, flat = _compiled_ensemble(model)
+    m, n = X.shape
+    phi = np.zeros(m * n)
+    X32 = X.astype(np.float32)  # sklearn trees compare float32 inputs against the thresholds
+    all_bits = np.bitwise_or.reduce(flat.cond_bit, axis=1)
+    leaf_idx = np.arange(flat.tables.shape[0])
+    for start in range(0, m, chunk_rows):
+        xs = X32[start:start + chunk_rows]
+        rows = np.arange(start, start + xs.shape[0])
+        # a feature's bit is cleared as soon as one of its conditions fails
+        failed = (xs[:, flat.cond_feat] <= flat.cond_thr) != flat.cond_left
+        pattern = all_bits & ~np.bitwise_or.reduce(np.where(failed, flat.cond_bit, 0), axis=2)
+        contrib = flat.tables[leaf_idx, pattern]                      # (rows, L, D)
+        target = rows[:, None, None] * n + flat.leaf_feat[None, :, :]
+        phi += np.bincount(target.ravel(), weights=contrib.ravel(), minlength=m * n)
+    return base, lr * phi.reshape(m, n)
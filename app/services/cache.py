@@ -0,0 +1,90 @@
+import hashlib
+import json
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+
+from core.feature_encoder import NUMERIC_COLUMNS, canonical_name
+
+def _canonical_value(col: str, v: t.Any) -> t.Any:
+    # Only fold spellings FeatureEncoder treats as equal, so a cache hit never
+    # accepts a request a cold call would reject
+    if col in NUMERIC_COLUMNS:
+        # 1, 1.0 and " 1.0" from different clients should hit the same entry
+        try:
+            return float(v)
+        except (TypeError, ValueError):
+            return v
+    if isinstance(v, bool):
+        return "Yes" if v else "No"
+    # categorical strings are matched exactly by the encoder
+    return v
+
+def prediction_key(features_vector: list[float] | None,
+                   features_dict: dict[str, t.Any] | None,
+                   extra_context: str | None,
+                   model_version: str) -> str:
+    """Stable hash of a scoring request, independent of key order and spelling."""
+    payload = {
+        "v": [float(x) for x in features_vector] if features_vector is not None else None,
+        "d": {(col := canonical_name(k)): _canonical_value(col, v) for k, v in features_dict.items()}
+             if features_dict is not None else None,
+        "c": (extra_context or "").strip() or None,
+        "m": model_version,
+    }
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+class PredictionCache:
+    """Thread-safe LRU cache with per-entry TTL and hit/miss counters."""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, t.Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: str) -> t.Any | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: t.Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
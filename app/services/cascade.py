@@ -0,0 +1,104 @@
+import hashlib
+import threading
+import time
+import typing as t
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from core.feature_encoder import canonical_name, TARGET_COLUMN
+
+# The four risk flags of the dashboard's rule scorer (app/main.py::predict_churn)
+RULE_FEATURES = ("contract", "paymentmethod", "monthlycharges", "tenure")
+
+def _rule_flags(contract, payment_method, monthly_charges, tenure):
+    return (
+        (contract == "Month-to-month") * 8
+        + (payment_method == "Electronic check") * 4
+        + (monthly_charges > 70) * 2
+        + (tenure < 12) * 1
+    )
+
+class RuleScorer:
+    """
+    Instant first tier: the rule flags of ``predict_churn``, but each of the
+    16 flag combinations scores its observed churn rate in the training data
+    instead of an additive guess, so the probability is calibrated. Rare
+    combinations and requests missing a rule feature get no score.
+    """
+
+    def __init__(self, rates: dict[int, float], version: str):
+        self.rates = rates
+        self.version = version
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, min_support: int = 30) -> "RuleScorer":
+        codes = _rule_flags(df["contract"], df["paymentmethod"], df["monthlycharges"], df["tenure"])
+        churned = (df[TARGET_COLUMN] == "Yes").astype(float)
+        agg = churned.groupby(codes).agg(["mean", "size"])
+        rates = {int(code): float(row["mean"]) for code, row in agg.iterrows() if row["size"] >= min_support}
+        digest = hashlib.sha1(repr(sorted(rates.items())).encode()).hexdigest()[:10]
+        return cls(rates, version=f"rules-{digest}")
+
+    def score(self, features_dict: dict[str, t.Any] | None) -> float | None:
+        if not features_dict:
+            return None
+        given = {canonical_name(k): v for k, v in features_dict.items()}
+        if any(given.get(f) is None for f in RULE_FEATURES):
+            return None
+        try:
+            code = _rule_flags(str(given["contract"]), str(given["paymentmethod"]),
+                               float(given["monthlycharges"]), float(given["tenure"]))
+        except (TypeError, ValueError):
+            return None
+        return self.rates.get(int(code))
+
+def outside_band(p: float | None, band: t.Sequence[float]) -> bool:
+    """A tier answers when its probability is outside its uncertainty band."""
+    return p is not None and not (band[0] <= p <= band[1])
+
+class _TierStats:
+    def __init__(self):
+        self.calls = self.answered = self.errors = 0
+        self.seconds = 0.0
+        self.recent: deque[float] = deque(maxlen=1000)
+
+class CascadeStats:
+    """Per-tier call counts, hit ratios and latencies of the scoring cascade."""
+
+    def __init__(self, tiers: t.Sequence[str]):
+        self.requests = 0
+        self.tiers = {name: _TierStats() for name in tiers}
+        self._lock = threading.Lock()
+
+    def request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record(self, tier: str, started: float, *, answered: bool, error: bool = False) -> None:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            s = self.tiers[tier]
+            s.calls += 1
+            s.answered += answered
+            s.errors += error
+            s.seconds += elapsed
+            s.recent.append(elapsed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = {}
+            for name, s in self.tiers.items():
+                recent_ms = np.array(s.recent or [0.0]) * 1000.0
+                out[name] = {
+                    "calls": s.calls,
+                    "answered": s.answered,
+                    "errors": s.errors,
+                    # share of all requests this tier answered / had to look at
+                    "hit_ratio": s.answered / self.requests if self.requests else 0.0,
+                    "call_ratio": s.calls / self.requests if self.requests else 0.0,
+                    "mean_ms": s.seconds * 1000.0 / s.calls if s.calls else 0.0,
+                    "recent_p95_ms": float(np.percentile(recent_ms, 95)),
+                }
+            return {"requests": self.requests, "tiers": out}
@@ -1,29 +1,48 @@
 import numpy as np
 from .model import _ensure_loaded, _model, _vectorize
 
-def _score_margin(X: np.ndarray) -> float:
+DELTA = 1e-3
+
+def _score_margin(X: np.ndarray) -> np.ndarray:
     if hasattr(_model, "decision_function"):
-        return float(_model.decision_function(X)[0])
+        return np.asarray(_model.decision_function(X), dtype=float)
     if hasattr(_model, "predict_proba"):
-        return float(_model.predict_proba(X)[0, 1])
-    return float(getattr(_model, "predict", lambda x: [0])(X)[0])
-
-def explain_local(features_vector=None, features_dict=None, top_k: int = 8):
-    _ensure_loaded()
-    X, names = _vectorize(features_vector, features_dict)
+        return np.asarray(_model.predict_proba(X)[:, 1], dtype=float)
+    return np.asarray(getattr(_model, "predict", lambda x: np.zeros(len(x)))(X), dtype=float)
 
-    base = _score_margin(X)
-    delta = 1e-3
-    vals = []
-    for j in range(X.shape[1]):
-        Xp = X.copy()
-        Xp[0, j] += delta
-        vals.append(_score_margin(Xp) - base)
-    vals = np.array(vals, dtype=float)
+def _perturbation_block(x: np.ndarray, delta: float = DELTA) -> np.ndarray:
+    """Row 0 is ``x`` itself, row ``j+1`` is ``x`` with feature ``j`` nudged by ``delta``."""
+    n = x.shape[0]
+    block = np.tile(x, (n + 1, 1))
+    block[1:] += delta * np.eye(n)
+    return block
 
+def _top_contributions(x: np.ndarray, vals: np.ndarray, names: list[str], top_k: int) -> list[dict]:
     idx = np.argsort(-np.abs(vals))[:top_k]
-    contribs = [
-        {"feature": names[i], "value": float(X[0, i]), "contribution": float(vals[i])}
+    return [
+        {"feature": names[i], "value": float(x[i]), "contribution": float(vals[i])}
         for i in idx
     ]
-    return {"base_value": float(base), "contributions": contribs, "top_k": int(top_k)}
+
+def explain_batch(X: np.ndarray, names: list[str], top_k: int = 8) -> list[dict]:
+    """
+    Finite-difference explanations for every row of ``X``. The perturbation
+    blocks of all rows are stacked into one ``(m*(n+1), n)`` matrix and scored
+    in a single model call.
+    """
+    m, n = X.shape
+    blocks = np.concatenate([_perturbation_block(x) for x in X]) if m else np.empty((0, n))
+    margins = _score_margin(blocks).reshape(m, n + 1)
+    base = margins[:, 0]
+    deltas = margins[:, 1:] - base[:, None]
+    return [
+        {"base_value": float(base[r]),
+         "contributions": _top_contributions(X[r], deltas[r], names, top_k),
+         "top_k": int(top_k)}
+        for r in range(m)
+    ]
+
+def explain_local(features_vector=None, features_dict=None, top_k: int = 8):
+    _ensure_loaded()
+    X, names = _vectorize(features_vector, features_dict)
+    return explain_batch(X, names, top_k=top_k)[0]
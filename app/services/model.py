@@ -1,31 +1,290 @@
 import os
 import json
+import asyncio
+import logging
+import threading
+import time
 import typing as t
+from collections import OrderedDict
+from contextlib import aclosing
+import numpy as np
 from ..utils.settings import settings
+from ..utils.sse import StreamTimer
 
 os.environ.setdefault("TRANSFORMERS_NO_TF", "1")
 os.environ.setdefault("TF_ENABLE_ONEDNN_OPTS", "0")
 
-# Import the expert class
-from core.ollama_handle import OllamaChurnExpert 
+from core.churn_model import UNREADABLE_ARTIFACT, ChurnModel, load_dataset, load_or_train
+from core.json_stream import JSONObjectScanner, first_json_object
+from core.lookup_table import LookupTable, compile_for
+from core.model_registry import ModelRegistry
+from .attribution import explain_rows
+from .cache import PredictionCache, prediction_key
+from .batcher import MicroBatcher
+from .cascade import CascadeStats, RuleScorer, outside_band
+
+logger = logging.getLogger(__name__)
+
+# The LLM expert is optional: scoring runs on the in-process model
+try:
+    from core.ollama_handle import OllamaChurnExpert
+except Exception:
+    OllamaChurnExpert = None
 try:
     from db.vector_db import VectorDB           
 except Exception:
     VectorDB = None
 
-_expert: OllamaChurnExpert | None = None
+class _ModelRef:
+    """
+    Stable handle to the active ChurnModel. ``explain.py`` imports ``_model``
+    by name, so activation swaps the wrapped model instead of rebinding the
+    global. The swap is one reference assignment: a request that already took
+    ``current`` finishes on that model, the next one sees the new model.
+    Recently active models stay loaded for instant rollback.
+    """
+    def __init__(self, keep_warm: int):
+        self.current: ChurnModel | None = None
+        self.keep_warm = max(1, keep_warm)
+        self.warm: OrderedDict[str, ChurnModel] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        current = self.__dict__.get("current")
+        if current is None:
+            raise RuntimeError("Churn model is not loaded")
+        return getattr(current, name)
+
+    def swap(self, model: ChurnModel) -> None:
+        with self.lock:
+            self.warm[model.version] = model
+            self.warm.move_to_end(model.version)
+            while len(self.warm) > self.keep_warm:
+                self.warm.popitem(last=False)
+            self.current = model
+
+_model = _ModelRef(keep_warm=settings.MODEL_KEEP_WARM)
+_registry = ModelRegistry(settings.MODEL_REGISTRY_PATH)
+_registry_status: dict[str, t.Any] = {"last_check": None, "last_error": None}
+_expert: t.Any = None
 _vector_db: t.Any = None
+# keys include the model version, so entries of other versions are just never hit
+_prediction_cache = PredictionCache(maxsize=settings.PREDICTION_CACHE_SIZE, ttl=settings.PREDICTION_CACHE_TTL)
+# concurrent /predict calls are coalesced into one model call per model version
+_batcher = MicroBatcher(lambda X, m: m.predict_proba(X)[:, 1],
+                        max_batch_size=settings.BATCH_MAX_SIZE, max_wait_ms=settings.BATCH_MAX_WAIT_MS)
+_rules: RuleScorer | None = None
+# SCORING_BACKEND="table": compiled lookup tables per model version, with their accuracy report
+# (report["accepted"] says whether the table serves or the model does)
+_tables: dict[str, tuple[LookupTable, dict]] = {}
+_tables_compiling: set[str] = set()
+_table_lock = threading.Lock()      # guards the two above, never held while compiling
+_compile_lock = threading.Lock()    # one compile at a time
+_cascade = CascadeStats(("rules", "model", "llm"))
+
+def _bootstrap_registry() -> str:
+    """Seed an empty registry from MODEL_PATH (trained from TRAIN_DATA_PATH if missing)."""
+    m = load_or_train(settings.MODEL_PATH, settings.TRAIN_DATA_PATH, kind=settings.MODEL_KIND)
+    return _registry.publish(m, activate=True)
+
+def _load_version(version: str) -> ChurnModel:
+    warm = _model.warm.get(version)
+    return warm if warm is not None else _registry.load(version)
 
 def _ensure_loaded():
-    global _expert, _vector_db
+    if _model.current is not None:
+        return
+    version = _registry.current_version()
+    try:
+        m = _load_version(version) if version else None
+    except (*UNREADABLE_ARTIFACT, FileNotFoundError):
+        # artifact of an older format, truncated or gone: retrain through MODEL_PATH
+        m = None
+    if m is None:
+        m = _registry.load(_bootstrap_registry())
+    if _model.current is None:
+        _model.swap(m)
+
+def _active_model() -> ChurnModel:
+    """Snapshot of the active model; use it for every step of one request."""
+    _ensure_loaded()
+    return _model.current
+
+def activate_model(version: str | None = None) -> dict:
+    """
+    Make ``version`` (default: the registry's CURRENT) the active model.
+    The artifact is loaded before the swap, so scoring never waits on disk;
+    activating a version also moves CURRENT so other workers follow.
+    """
+    if version is not None and version not in _model.warm and not _registry.has(version):
+        raise KeyError(f"Model version {version!r} is not in the registry")
+    target = version or _registry.current_version()
+    if target is None:
+        _ensure_loaded()
+        return model_info()
+    m = _load_version(target)
+    if version is not None and _registry.current_version() != version:
+        _registry.activate(version)
+    if _model.current is not m:
+        _model.swap(m)
+    if settings.SCORING_BACKEND == "table":
+        _table_if_ready(m)
+    return model_info()
+
+def reload_model():
+    """Re-read CURRENT from the registry and swap to it if it changed."""
+    return activate_model(None)
+
+def model_info() -> dict:
+    current = _model.current
+    return {
+        "active": current.version if current is not None else None,
+        "registry_current": _registry.current_version(),
+        "warm": list(_model.warm),
+        "versions": _registry.versions(),
+        **_registry_status,
+    }
+
+async def watch_registry(interval: float) -> None:
+    """Follow CURRENT on disk so `model_registry activate` reaches every worker."""
+    while True:
+        await asyncio.sleep(interval)
+        if _model.current is None:
+            continue
+        try:
+            version = await asyncio.to_thread(_registry.current_version)
+            if version and version != _model.current.version:
+                await asyncio.to_thread(activate_model, None)
+            _registry_status["last_error"] = None
+        except Exception as e:
+            _registry_status["last_error"] = f"{type(e).__name__}: {e}"
+        _registry_status["last_check"] = time.time()
+
+def _llm_version() -> str:
+    return f"llm:{settings.OLLAMA_MODEL}"
+
+def _ensure_rules() -> RuleScorer:
+    global _rules
+    if _rules is None:
+        _rules = RuleScorer.from_frame(load_dataset(settings.TRAIN_DATA_PATH))
+    return _rules
+
+def _ensure_table(m: ChurnModel) -> tuple[LookupTable, dict]:
+    """The table of ``m``, compiled first if needed (seconds: keep it off the event loop)."""
+    entry = _tables.get(m.version)
+    if entry is None:
+        with _compile_lock:
+            entry = _tables.get(m.version)
+            if entry is None:
+                table, report = compile_for(m, settings.TRAIN_DATA_PATH, max_cells=settings.LOOKUP_TABLE_MAX_CELLS,
+                                            interpolate=settings.LOOKUP_TABLE_INTERPOLATE)
+                report["rejected_because"] = _table_rejections(report)
+                report["accepted"] = not report["rejected_because"]
+                if not report["accepted"]:
+                    logger.warning("Lookup table for %s rejected (%s), scoring with the model: %s",
+                                   m.version, "; ".join(report["rejected_because"]), report)
+                entry = table, report
+                with _table_lock:
+                    # tables follow the warm models; the others are dropped
+                    for version in [v for v in _tables if v not in _model.warm]:
+                        del _tables[version]
+                    _tables[m.version] = entry
+    return entry
+
+def _compile_table_in_background(m: ChurnModel) -> None:
+    try:
+        _ensure_table(m)
+    except Exception:
+        logger.exception("Compiling the lookup table for %s failed, scoring with the model", m.version)
+    finally:
+        with _table_lock:
+            _tables_compiling.discard(m.version)
+
+def _table_if_ready(m: ChurnModel) -> tuple[LookupTable, dict] | None:
+    """The table of ``m`` if compiled; otherwise start compiling it in a thread and return None."""
+    entry = _tables.get(m.version)
+    if entry is None:
+        with _table_lock:
+            if m.version in _tables_compiling or m.version in _tables:
+                return _tables.get(m.version)
+            _tables_compiling.add(m.version)
+        threading.Thread(target=_compile_table_in_background, args=(m,),
+                         name=f"lookup-table-{m.version}", daemon=True).start()
+    return entry
+
+def _table_rejections(report: dict) -> list[str]:
+    """Why a compiled table must not replace the model (empty: it may)."""
+    reasons = []
+    if report["max_abs_error"] > settings.LOOKUP_TABLE_MAX_ABS_ERROR:
+        reasons.append(f"max_abs_error {report['max_abs_error']:.4f} > {settings.LOOKUP_TABLE_MAX_ABS_ERROR}")
+    if report["decision_agreement"] < settings.LOOKUP_TABLE_MIN_AGREEMENT:
+        reasons.append(f"decision_agreement {report['decision_agreement']:.4f} < {settings.LOOKUP_TABLE_MIN_AGREEMENT}")
+    if settings.LOOKUP_TABLE_REQUIRE_FASTER and report["table_us_per_row"] >= report["model_us_per_row"]:
+        reasons.append(f"table_us_per_row {report['table_us_per_row']:.3f} >= "
+                       f"model_us_per_row {report['model_us_per_row']:.3f}")
+    return reasons
+
+def lookup_table_info() -> dict:
+    table, report = _ensure_table(_active_model())
+    enabled = settings.SCORING_BACKEND == "table"
+    return {"enabled": enabled, "serving": enabled and report["accepted"], **table.stats(), "accuracy": report}
+
+def _scorer(m: ChurnModel | None) -> tuple[t.Any, str]:
+    """What scores the request (model or its lookup table) and the version reported for it."""
+    if m is None:
+        return None, _llm_version()
+    if settings.SCORING_BACKEND == "table":
+        # the model serves until the table is compiled (and for good if it is rejected)
+        entry = _table_if_ready(m)
+        if entry is not None and entry[1]["accepted"]:
+            return entry[0], f"{m.version}+table"
+    return m, m.version
+
+def _scoring_model() -> ChurnModel | None:
+    """Model snapshot for scoring, or None when SCORING_BACKEND="llm"."""
+    return None if settings.SCORING_BACKEND == "llm" else _active_model()
+
+def model_version() -> str:
+    m = _scoring_model()
+    return m.version if m is not None else _llm_version()
+
+def cache_stats() -> dict:
+    return _prediction_cache.stats()
+
+def batching_stats() -> dict:
+    return _batcher.stats()
+
+def cascade_stats() -> dict:
+    return {
+        "enabled": settings.SCORING_BACKEND == "cascade",
+        "rules_band": list(settings.CASCADE_RULES_BAND),
+        "model_band": list(settings.CASCADE_MODEL_BAND),
+        **_cascade.stats(),
+    }
+
+async def stop_batcher() -> None:
+    await _batcher.stop()
+
+def _ensure_vector_db():
+    global _vector_db
+    if _vector_db is None and VectorDB and settings.VECTOR_DB_PATH:
+        _vector_db = VectorDB(path=settings.VECTOR_DB_PATH)
+    return _vector_db
+
+def _ensure_expert():
+    global _expert
     if _expert is None:
-        if VectorDB and settings.VECTOR_DB_PATH:
-            _vector_db = VectorDB(path=settings.VECTOR_DB_PATH)
+        if OllamaChurnExpert is None:
+            raise RuntimeError("LLM backend unavailable: core.ollama_handle could not be imported")
+        _ensure_vector_db()
         _expert = OllamaChurnExpert(
             model=settings.OLLAMA_MODEL,
             host=settings.OLLAMA_HOST,
             vector_db=_vector_db,
             top_k=getattr(settings, "TOP_K", 4),
+            cache_path=settings.LLM_CACHE_PATH,
+            json_max_tokens=settings.LLM_JSON_MAX_TOKENS,
+            json_attempts=settings.LLM_JSON_ATTEMPTS,
         )
 
 def _to_features_dict(features_vector: list[float] | None,
@@ -36,19 +295,202 @@ def _to_features_dict(features_vector: list[float] | None,
         return {f"f{i}": float(v) for i, v in enumerate(features_vector)}
     raise ValueError("Provide features_dict or features_vector")
 
+def _vectorize(features_vector: list[float] | None = None,
+               features_dict: dict[str, t.Any] | None = None,
+               m: ChurnModel | None = None) -> tuple[np.ndarray, list[str]]:
+    """Encode one request into a ``(1, n_features)`` matrix in the column order of ``m`` (default: active)."""
+    m = m or _active_model()
+    if features_dict is not None:
+        X = m.encode(features_dict)[None, :]
+    elif features_vector is not None:
+        X = m.check_matrix(features_vector)
+    else:
+        raise ValueError("Provide features_dict or features_vector")
+    return X, m.feature_names
+
+def _cache_key(features_vector, features_dict, extra_context, version: str, use_llm: bool) -> str:
+    # extra_context only changes the answer of the LLM backend
+    return prediction_key(features_vector, features_dict, extra_context if use_llm else None, version)
+
+def predict(features_vector: list[float] | None = None,
+            features_dict: dict[str, t.Any] | None = None,
+            *, extra_context: str | None = None) -> dict:
+    """
+    ``{"churn_proba", "model_version"}`` from the in-process model, or its
+    precompiled lookup table with SCORING_BACKEND="table".
+    With SCORING_BACKEND="llm" the OllamaChurnExpert is asked instead.
+    Results are cached per canonical request and model version.
+    """
+    if settings.SCORING_BACKEND == "cascade":
+        return _cascade_predict(features_vector, features_dict, extra_context=extra_context)
+    m = _scoring_model()
+    scorer, version = _scorer(m)
+    key = _cache_key(features_vector, features_dict, extra_context, version, m is None)
+    p = _prediction_cache.get(key)
+    if p is None:
+        if m is None:
+            p = _llm_predict_proba(features_vector, features_dict, extra_context=extra_context)
+        else:
+            X, _ = _vectorize(features_vector, features_dict, m)
+            p = float(scorer.predict_proba(X)[0, 1])
+        _prediction_cache.put(key, p)
+    return {"churn_proba": p, "model_version": version}
+
 def predict_proba(features_vector: list[float] | None = None,
                   features_dict: dict[str, t.Any] | None = None,
                   *, extra_context: str | None = None) -> float:
+    """Predict churn probability 0..1; see ``predict``."""
+    return predict(features_vector, features_dict, extra_context=extra_context)["churn_proba"]
+
+async def apredict(features_vector: list[float] | None = None,
+                   features_dict: dict[str, t.Any] | None = None,
+                   *, extra_context: str | None = None) -> dict:
     """
-    Predict churn probability using OllamaChurnExpert and return value 0..1.
-    If expert has predict_proba method, use it directly,
-    otherwise ask LLM for JSON with churn_proba field.
+    Async ``predict``. The in-process model goes through the
+    micro-batcher, the LLM backend awaits the pooled Ollama client.
     """
-    _ensure_loaded()
-    feats = _to_features_dict(features_vector, features_dict)
-    if hasattr(_expert, "predict_proba"):
-        return float(_expert.predict_proba(features=feats, extra_context=extra_context))
+    if settings.SCORING_BACKEND == "cascade":
+        return await _acascade_predict(features_vector, features_dict, extra_context=extra_context)
+    m = _scoring_model()
+    # a table lookup is cheaper than queueing for a batch (a rejected table leaves the model batching)
+    if m is not None and (settings.BATCH_MAX_SIZE <= 1 or
+                          settings.SCORING_BACKEND == "table" and _scorer(m)[0] is not m):
+        return predict(features_vector, features_dict, extra_context=extra_context)
+    version = m.version if m is not None else _llm_version()
+    key = _cache_key(features_vector, features_dict, extra_context, version, m is None)
+    p = _prediction_cache.get(key)
+    if p is None:
+        if m is not None:
+            X, _ = _vectorize(features_vector, features_dict, m)
+            # scored by the same model snapshot even if a swap happens while queued
+            p = await _batcher.submit(X[0], m)
+        else:
+            _ensure_expert()
+            obj = await _expert.aask_json(_score_prompt(features_vector, features_dict, extra_context),
+                                          validate=_check_score)
+            p = float(obj["churn_proba"])
+        _prediction_cache.put(key, p)
+    return {"churn_proba": p, "model_version": version}
+
+async def apredict_proba(features_vector: list[float] | None = None,
+                         features_dict: dict[str, t.Any] | None = None,
+                         *, extra_context: str | None = None) -> float:
+    return (await apredict(features_vector, features_dict, extra_context=extra_context))["churn_proba"]
+
+# ---- cascade ---------------------------------------------------------------------
+#
+# SCORING_BACKEND="cascade": calibrated rules -> in-process model -> LLM. A tier
+# answers when its probability is outside its CASCADE_*_BAND; only requests
+# inside the band go on to the next, more expensive tier. If the LLM fails,
+# the model's score is returned.
+
+def _cascade_rules(features_dict) -> dict | None:
+    _cascade.request()
+    started = time.perf_counter()
+    rules = _ensure_rules()
+    p = rules.score(features_dict)
+    answered = outside_band(p, settings.CASCADE_RULES_BAND)
+    _cascade.record("rules", started, answered=answered)
+    return {"churn_proba": p, "model_version": rules.version} if answered else None
+
+def _cascade_model_done(p: float, started: float) -> bool:
+    answered = outside_band(p, settings.CASCADE_MODEL_BAND)
+    _cascade.record("model", started, answered=answered)
+    return answered
+
+def _cascade_predict(features_vector, features_dict, *, extra_context: str | None = None) -> dict:
+    res = _cascade_rules(features_dict)
+    if res is not None:
+        return res
+
+    m, started = _active_model(), time.perf_counter()
+    try:
+        X, _ = _vectorize(features_vector, features_dict, m)
+        p = float(m.predict_proba(X)[0, 1])
+    except Exception:
+        _cascade.record("model", started, answered=False, error=True)
+        raise
+    if _cascade_model_done(p, started):
+        return {"churn_proba": p, "model_version": m.version}
+
+    started = time.perf_counter()
+    key = _cache_key(features_vector, features_dict, extra_context, _llm_version(), True)
+    try:
+        q = _prediction_cache.get(key)
+        if q is None:
+            q = _llm_predict_proba(features_vector, features_dict, extra_context=extra_context)
+            _prediction_cache.put(key, q)
+    except Exception:
+        _cascade.record("llm", started, answered=False, error=True)
+        return {"churn_proba": p, "model_version": m.version}
+    _cascade.record("llm", started, answered=True)
+    return {"churn_proba": q, "model_version": _llm_version()}
+
+async def _acascade_predict(features_vector, features_dict, *, extra_context: str | None = None) -> dict:
+    res = _cascade_rules(features_dict)
+    if res is not None:
+        return res
+
+    m, started = _active_model(), time.perf_counter()
+    try:
+        X, _ = _vectorize(features_vector, features_dict, m)
+        if settings.BATCH_MAX_SIZE > 1:
+            p = await _batcher.submit(X[0], m)
+        else:
+            p = float(m.predict_proba(X)[0, 1])
+    except Exception:
+        _cascade.record("model", started, answered=False, error=True)
+        raise
+    if _cascade_model_done(p, started):
+        return {"churn_proba": p, "model_version": m.version}
+
+    started = time.perf_counter()
+    key = _cache_key(features_vector, features_dict, extra_context, _llm_version(), True)
+    try:
+        q = _prediction_cache.get(key)
+        if q is None:
+            _ensure_expert()
+            obj = await _expert.aask_json(_score_prompt(features_vector, features_dict, extra_context),
+                                          validate=_check_score)
+            q = float(obj["churn_proba"])
+            _prediction_cache.put(key, q)
+    except Exception:
+        _cascade.record("llm", started, answered=False, error=True)
+        return {"churn_proba": p, "model_version": m.version}
+    _cascade.record("llm", started, answered=True)
+    return {"churn_proba": q, "model_version": _llm_version()}
 
+def predict_proba_batch(rows: t.Sequence[tuple[list[float] | None, dict[str, t.Any] | None]]
+                        ) -> tuple[np.ndarray, list[str | None]]:
+    """
+    Score many ``(features_vector, features_dict)`` rows with one model call.
+    Returns probabilities in input order (NaN for rejected rows) and per-row errors.
+    Always uses the in-process model, regardless of SCORING_BACKEND.
+    """
+    m = _active_model()
+    X = np.zeros((len(rows), m.n_features), dtype=np.float32)
+    errors: list[str | None] = [None] * len(rows)
+    # dict rows are encoded column-wise in one pass, vectors only need a shape check
+    dict_idx = [i for i, (_, feats) in enumerate(rows) if feats is not None]
+    if dict_idx:
+        X[dict_idx], dict_errors = m.encoder.transform([rows[i][1] for i in dict_idx], collect_errors=True)
+        for i, err in zip(dict_idx, dict_errors):
+            errors[i] = err
+    for i, (vec, feats) in enumerate(rows):
+        if feats is None:
+            try:
+                X[i] = _vectorize(vec, None, m)[0][0]
+            except ValueError as e:
+                errors[i] = str(e)
+
+    ok = np.array([e is None for e in errors], dtype=bool)
+    proba = np.full(len(rows), np.nan)
+    if ok.any():
+        proba[ok] = m.predict_proba(X[ok])[:, 1]
+    return proba, errors
+
+def _score_prompt(features_vector, features_dict, extra_context) -> str:
+    feats = _to_features_dict(features_vector, features_dict)
     prompt = (
         "You are a churn scoring assistant.\n"
         "Return STRICT JSON ONLY: {\"churn_proba\": <float between 0 and 1>}.\n"
@@ -56,27 +498,64 @@ def predict_proba(features_vector: list[float] | None = None,
     )
     if extra_context:
         prompt += f"\nContext:\n{extra_context}\n"
+    return prompt
+
+def _llm_predict_proba(features_vector: list[float] | None = None,
+                       features_dict: dict[str, t.Any] | None = None,
+                       *, extra_context: str | None = None) -> float:
+    """
+    If expert has predict_proba method, use it directly,
+    otherwise ask LLM for JSON with churn_proba field.
+    """
+    _ensure_expert()
+    if hasattr(_expert, "predict_proba"):
+        feats = _to_features_dict(features_vector, features_dict)
+        return float(_expert.predict_proba(features=feats, extra_context=extra_context))
 
+    prompt = _score_prompt(features_vector, features_dict, extra_context)
+    if hasattr(_expert, "ask_json"):
+        # generation stops at the first valid JSON object
+        return float(_expert.ask_json(prompt, validate=_check_score)["churn_proba"])
     if hasattr(_expert, "ask"):
         text = _expert.ask(prompt)
     elif hasattr(_expert, "chat"):
         text = _expert.chat(prompt)
     else:
-        raise RuntimeError("OllamaChurnExpert has no .ask/.chat/.predict_proba")
+        raise RuntimeError("OllamaChurnExpert has no .ask_json/.ask/.chat/.predict_proba")
 
-    p = _extract_churn_proba(text)
-    return max(0.0, min(1.0, p))
+    obj = first_json_object(text)
+    _check_score(obj)
+    return float(obj["churn_proba"])
 
 def explain_local(features_vector: list[float] | None = None,
                   features_dict: dict[str, t.Any] | None = None,
                   *, top_k: int = 8,
                   extra_context: str | None = None) -> dict:
     """
-    Ask LLM for explanation. Returns structured response for API.
+    Exact attributions from the in-process model (log-odds space).
+    With EXPLAIN_BACKEND="llm" the OllamaChurnExpert is asked instead.
     """
-    _ensure_loaded()
-    feats = _to_features_dict(features_vector, features_dict)
+    if settings.EXPLAIN_BACKEND == "llm":
+        res = _llm_explain_local(features_vector, features_dict, top_k=top_k, extra_context=extra_context)
+        return {**res, "model_version": _llm_version()}
+    m = _active_model()
+    X, _ = _vectorize(features_vector, features_dict, m)
+    return {**explain_rows(m, X, top_k=top_k)[0], "model_version": m.version}
+
+async def aexplain_local(features_vector: list[float] | None = None,
+                         features_dict: dict[str, t.Any] | None = None,
+                         *, top_k: int = 8,
+                         extra_context: str | None = None) -> dict:
+    """Async ``explain_local``: the LLM backend awaits the pooled Ollama client."""
+    if settings.EXPLAIN_BACKEND != "llm":
+        return explain_local(features_vector, features_dict, top_k=top_k, extra_context=extra_context)
+    _ensure_expert()
+    obj = await _expert.aask_json(_explain_messages(features_vector, features_dict, top_k, extra_context),
+                                  validate=_check_explanation)
+    return {**_normalize_explanation(obj, top_k), "model_version": _llm_version()}
 
+def _explain_messages(features_vector, features_dict, top_k: int, extra_context) -> dict:
+    feats = _to_features_dict(features_vector, features_dict)
     sys = (
         "You are a churn explainer. Return STRICT JSON ONLY with schema:\n"
         '{"base_value": number, "contributions":[{"feature": string, "value": number, "contribution": number}], "top_k": number, "reason": string}\n'
@@ -86,16 +565,9 @@ def explain_local(features_vector: list[float] | None = None,
     user = f"Features: {json.dumps(feats, ensure_ascii=False)}"
     if extra_context:
         user += f"\nContext:\n{extra_context}"
+    return {"system": sys, "user": user}
 
-    if hasattr(_expert, "ask_json"):
-        obj = _expert.ask_json(system=sys, user=user)
-    else:
-        if hasattr(_expert, "ask"):
-            text = _expert.ask({"system": sys, "user": user})
-        else:
-            text = _expert.chat({"system": sys, "user": user})
-        obj = _extract_json(text)
-
+def _normalize_explanation(obj: dict, top_k: int) -> dict:
     # sanity-check
     base = float(obj.get("base_value", 0.5))
     contribs = obj.get("contributions", [])
@@ -120,15 +592,81 @@ def explain_local(features_vector: list[float] | None = None,
         "reason": obj.get("reason"),
     }
 
-import re
-JSON_RE = re.compile(r"\{.*\}", re.S)
+def _llm_explain_local(features_vector: list[float] | None = None,
+                       features_dict: dict[str, t.Any] | None = None,
+                       *, top_k: int = 8,
+                       extra_context: str | None = None) -> dict:
+    """
+    Ask LLM for explanation. Returns structured response for API.
+    """
+    _ensure_expert()
+    messages = _explain_messages(features_vector, features_dict, top_k, extra_context)
+
+    if hasattr(_expert, "ask_json"):
+        obj = _expert.ask_json(messages, validate=_check_explanation)
+    else:
+        if hasattr(_expert, "ask"):
+            text = _expert.ask(messages)
+        else:
+            text = _expert.chat(messages)
+        obj = first_json_object(text)
+    return _normalize_explanation(obj, top_k)
 
-def _extract_json(text: str) -> dict:
-    m = JSON_RE.search((text or "").strip())
-    if not m:
-        raise ValueError(f"Cannot find JSON in output: {text[:200]}...")
-    return json.loads(m.group(0))
+async def astream_explanation(features_vector: list[float] | None = None,
+                              features_dict: dict[str, t.Any] | None = None,
+                              *, top_k: int = 8,
+                              extra_context: str | None = None) -> t.AsyncIterator[tuple[str, dict]]:
+    """
+    Yield ``("token", {"text": ...})`` while the LLM explanation is generated,
+    then one ``("result", ExplainResponse + timing)``. Generation is stopped
+    as soon as the JSON object is complete. The in-process backend only
+    yields the result.
+    """
+    timer = StreamTimer()
+    if settings.EXPLAIN_BACKEND != "llm":
+        res = explain_local(features_vector, features_dict, top_k=top_k, extra_context=extra_context)
+        yield "result", {**res, "timing": timer.summary()}
+        return
+    _ensure_expert()
+    scanner, obj = JSONObjectScanner(), None
+    stream = _expert.astream(_explain_messages(features_vector, features_dict, top_k, extra_context))
+    async with aclosing(stream):
+        async for chunk in stream:
+            timer.tick()
+            yield "token", {"text": chunk}
+            obj = scanner.feed(chunk)
+            if obj is not None:
+                break
+    if obj is None:
+        raise ValueError(f"Cannot find JSON in output: {scanner.text[:200]}...")
+    _check_explanation(obj)
+    res = _normalize_explanation(obj, top_k)
+    yield "result", {**res, "model_version": _llm_version(), "timing": timer.summary()}
+
+async def aanswer_question(question: str) -> str:
+    """RAG answer from the Ollama expert for the chat and call-center assistants."""
+    _ensure_expert()
+    return await _expert.agenerate_answer(question)
 
-def _extract_churn_proba(text: str) -> float:
-    obj = _extract_json(text)
-    return float(obj.get("churn_proba"))
+async def astream_answer(question: str) -> t.AsyncIterator[str]:
+    _ensure_expert()
+    async for chunk in _expert.astream_answer(question):
+        yield chunk
+
+def _check_score(obj: dict) -> None:
+    p = obj.get("churn_proba")
+    if isinstance(p, bool) or not isinstance(p, (int, float, str)):
+        raise ValueError(f"churn_proba must be a number, got {p!r}")
+    p = float(p)
+    if not 0.0 <= p <= 1.0:
+        raise ValueError(f"churn_proba must be between 0 and 1, got {p}")
+
+def _check_explanation(obj: dict) -> None:
+    contribs = obj.get("contributions")
+    if not isinstance(contribs, list) or not contribs:
+        raise ValueError("contributions must be a non-empty list")
+    for c in contribs:
+        if not isinstance(c, dict) or not c.get("feature"):
+            raise ValueError(f"every contribution needs a feature, got {c!r}")
+        if c.get("contribution") is not None:
+            float(c["contribution"])
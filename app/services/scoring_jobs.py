@@ -0,0 +1,89 @@
+import threading
+import time
+import typing as t
+import uuid
+
+from ..utils.settings import settings
+from . import model
+from .aggregates import aggregates
+
+class ScoringJob:
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.status = "queued"
+        self.rows = 0
+        self.result: dict | None = None
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.finished_at: float | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "rows": self.rows,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+_jobs: dict[str, ScoringJob] = {}
+_lock = threading.Lock()
+
+def _run(job: ScoringJob, work: t.Callable[..., dict]) -> None:
+    from db.engine import get_engine
+    job.status = "running"
+    try:
+        def progress(n: int):
+            job.rows = n
+        # every committed chunk updates the dashboard aggregates
+        with aggregates.writing():
+            # batch job: its own pool without the interactive statement timeout
+            job.result = work(get_engine(statement_timeout_ms=0), on_chunk=progress, on_delta=aggregates.apply)
+        job.status = "done"
+    except Exception as e:
+        job.status, job.error = "failed", f"{type(e).__name__}: {e}"
+    job.finished_at = time.time()
+
+def _start(kind: str, work: t.Callable[..., dict]) -> ScoringJob:
+    # one bulk job at a time: imports and rescoring write the same tables
+    with _lock:
+        running = [j for j in _jobs.values() if j.status in ("queued", "running")]
+        if running:
+            return running[0]
+        job = ScoringJob(kind)
+        _jobs[job.id] = job
+    threading.Thread(target=_run, args=(job, work), name=f"{kind}-{job.id}", daemon=True).start()
+    return job
+
+RESCORE_MODES = ("incremental", "full")
+
+def start_rescore_job(mode: str = "incremental") -> ScoringJob:
+    """
+    Score the customers table in a background thread; one job runs at a time.
+    ``incremental`` only scores new/changed customers and those scored by an
+    older model version, ``full`` rescores every row.
+    """
+    from core.bulk_score import score_customers, score_changed_customers
+    if mode not in RESCORE_MODES:
+        raise ValueError(f"Unknown rescore mode {mode!r}, expected one of {RESCORE_MODES}")
+    fn = score_customers if mode == "full" else score_changed_customers
+
+    def work(engine, **callbacks) -> dict:
+        return fn(engine, model._active_model(), chunk_size=settings.BULK_SCORE_CHUNK_SIZE,
+                  high_risk=settings.HIGH_RISK_THRESHOLD, **callbacks)
+    return _start(mode, work)
+
+def start_import_job() -> ScoringJob:
+    """Upsert IMPORT_DATA_PATH into the customers table in a background thread."""
+    from core.import_data import import_customers
+
+    def work(engine, **callbacks) -> dict:
+        return import_customers(engine, settings.IMPORT_DATA_PATH, settings.IMPORT_CHUNK_SIZE, **callbacks)
+    return _start("import", work)
+
+def get_job(job_id: str) -> ScoringJob | None:
+    return _jobs.get(job_id)
@@ -0,0 +1,328 @@
+"""
+Scoring / explanation micro-benchmarks on the Telco dataset.
+
+    python -m benchmarks.bench_scoring                       # run, compare with benchmarks/baseline.json
+    python -m benchmarks.bench_scoring --out results.json    # also write the results
+    python -m benchmarks.bench_scoring --save-baseline       # make this run the new baseline
+
+Every case records per-call latency (min/p50/p95/mean), throughput for
+batch cases, and the peak traced allocation of one call (numpy buffers
+included). The whole suite runs ``--rounds`` times; each case reports the
+median of its rounds and keeps every round. A case is a regression when even
+its fastest round (``min_ms`` by default) is slower than the *slowest*
+baseline round, or its peak memory exceeds the baseline peak, by more than
+both the relative tolerance and a small absolute slack; the exit code is
+then 1. Millisecond-scale pandas cases swing by 40% and more between rounds
+on shared machines (rounds land at either of two speeds), so the gate only
+reports changes that leave the noise band both runs actually showed; on a
+quiet machine that band is narrow and the gate correspondingly sensitive.
+
+Absolute timings only mean something on the host that produced them. The
+baseline records a host fingerprint (CPU model, core count, Python and
+library versions) and the time of a fixed calibration workload that does not
+touch the code under test. A baseline from a different host is refused (exit
+code 2); with ``--cross-host`` its latencies are scaled by the calibration
+ratio instead, which gives an indicative comparison only. On the same host
+the calibration ratio is printed but not applied: it is as noisy as the
+cases it would correct.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import typing as t
+from datetime import datetime, timezone
+from pathlib import Path
+
+# service-level cases measure the scoring code, not the prediction cache
+os.environ.setdefault("PREDICTION_CACHE_SIZE", "0")
+os.environ.setdefault("SCORING_BACKEND", "model")
+os.environ.setdefault("EXPLAIN_BACKEND", "model")
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+from core.churn_model import ChurnModel, load_dataset, load_or_train
+from core.feature_encoder import ID_COLUMN, TARGET_COLUMN
+
+DEFAULT_DATA = "data/raw/Telco-Customer-Churn.csv"
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+BATCH_SIZES = (1, 64, 1024, 7043)
+EXPLAIN_BATCH_SIZES = (1, 64, 1024)
+
+
+def measure(fn: t.Callable[[], t.Any], *, rows: int = 1, repeat: int = 50,
+            min_seconds: float = 0.2, warmup: int = 3) -> dict:
+    for _ in range(warmup):
+        fn()
+    times = []
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        while len(times) < repeat or time.perf_counter() - start < min_seconds:
+            t0 = time.perf_counter_ns()
+            fn()
+            times.append((time.perf_counter_ns() - t0) / 1e6)
+            if len(times) >= 100 * repeat:
+                break
+    finally:
+        gc.enable()
+    times_ms = np.array(times)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50 = float(np.percentile(times_ms, 50))
+    return {
+        "rows": rows,
+        "calls": len(times_ms),
+        "min_ms": float(times_ms.min()),
+        "p50_ms": p50,
+        "p95_ms": float(np.percentile(times_ms, 95)),
+        "mean_ms": float(times_ms.mean()),
+        "rows_per_second": rows * 1000.0 / p50 if p50 else None,
+        "peak_kib": peak / 1024.0,
+    }
+
+
+def calibrate(rounds: int = 5) -> float:
+    """
+    Best-of-``rounds`` milliseconds of a fixed workload mixing what the cases
+    spend their time on: per-call numpy/Python overhead, a float32 matmul and
+    a sort. It never imports project code, so it only moves with the host.
+    """
+    rng = np.random.default_rng(0)
+    a = rng.random((256, 256), dtype=np.float32)
+    v = rng.random(100_000)
+    small = rng.random(16)
+
+    def work():
+        for _ in range(2_000):
+            np.dot(small, small)
+        a @ a
+        np.sort(v)
+
+    work()
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter_ns()
+        work()
+        best = min(best, (time.perf_counter_ns() - t0) / 1e6)
+    return best
+
+
+def _cpu_model() -> str:
+    try:
+        for line in Path("/proc/cpuinfo").read_text().splitlines():
+            if line.startswith("model name"):
+                return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def host_fingerprint() -> dict:
+    """What must match for absolute timings to be comparable."""
+    import pandas as pd
+    import sklearn
+    return {
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "cpu": _cpu_model(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def run(data_path: str, model_path: str, kinds: t.Sequence[str], repeat: int, rounds: int = 3) -> dict:
+    df = load_dataset(data_path)
+    features = df.drop(columns=[ID_COLUMN, TARGET_COLUMN])
+    records = features.to_dict("records")
+    cases: dict[str, tuple[t.Callable[[], t.Any], int]] = {}
+    versions: dict[str, str] = {}
+
+    def case(name: str, fn, rows: int = 1):
+        cases[name] = (fn, rows)
+
+    # ---- in-process model per kind ------------------------------------------------
+    from Backend.app.services.attribution import explain_rows
+    for kind in kinds:
+        model = load_or_train(model_path, data_path) if kind == "logistic" \
+            else ChurnModel.train(data_path, kind=kind)
+        versions[kind] = model.version
+        X = model.vectorize(features)
+        case(f"encode/{kind}/single", lambda m=model: m.encode(records[0]))
+        for n in BATCH_SIZES:
+            case(f"encode/{kind}/batch={n}", lambda m=model, f=features.iloc[:n]: m.vectorize(f), rows=n)
+        for n in BATCH_SIZES:
+            case(f"predict/{kind}/batch={n}", lambda m=model, Xn=X[:n]: m.predict_proba(Xn), rows=n)
+        for n in EXPLAIN_BATCH_SIZES:
+            case(f"explain/{kind}/batch={n}", lambda m=model, Xn=X[:n]: explain_rows(m, Xn, top_k=8), rows=n)
+
+    # ---- service entry points (active model, cache disabled) -----------------------
+    from Backend.app.services import model as svc
+    versions["service"] = svc.model_version()
+    case("service/predict_proba/single", lambda: svc.predict_proba(None, records[0]))
+    case("service/explain_local/single", lambda: svc.explain_local(None, records[0]))
+    for n in BATCH_SIZES:
+        rows = [(None, r) for r in records[:n]]
+        case(f"service/predict_proba_batch/batch={n}", lambda rows=rows: svc.predict_proba_batch(rows), rows=n)
+
+    per_round: dict[str, list[dict]] = {name: [] for name in cases}
+    calibration = []
+    for r in range(rounds):
+        calibration.append(calibrate())
+        print(f"round {r + 1}/{rounds}", flush=True)
+        for name, (fn, rows) in cases.items():
+            res = measure(fn, rows=rows, repeat=repeat)
+            print(f"  {name:<42} min {res['min_ms']:9.3f} ms  p50 {res['p50_ms']:9.3f} ms  "
+                  f"peak {res['peak_kib']:9.1f} KiB", flush=True)
+            per_round[name].append(res)
+    results = {name: _median_round(runs) for name, runs in per_round.items()}
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "host": host_fingerprint(),
+            # median of the rounds, like the cases
+            "calibration_ms": float(np.median(calibration)),
+            "dataset_rows": len(df),
+            "rounds": rounds,
+            "model_versions": versions,
+        },
+        "results": results,
+    }
+
+
+LATENCY_STATS = ("min_ms", "p50_ms", "p95_ms", "mean_ms")
+
+
+def _median_round(runs: list[dict]) -> dict:
+    """Per-statistic median over the rounds of one case; memory keeps the smallest peak."""
+    out = {"rows": runs[0]["rows"], "calls": sum(r["calls"] for r in runs), "rounds": {}}
+    for stat in LATENCY_STATS:
+        out["rounds"][stat] = [r[stat] for r in runs]
+        out[stat] = float(np.median(out["rounds"][stat]))
+    out["rows_per_second"] = out["rows"] * 1000.0 / out["p50_ms"] if out["p50_ms"] else None
+    out["peak_kib"] = min(r["peak_kib"] for r in runs)
+    return out
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# changes below these are noise regardless of the relative tolerance
+MIN_TIME_DELTA_MS = 0.05
+MIN_MEMORY_DELTA_KIB = 64.0
+
+
+class HostMismatch(Exception):
+    """The baseline was recorded on another host (or with other library versions)."""
+
+
+def host_scale(current: dict, baseline: dict, cross_host: bool = False) -> float:
+    """
+    Factor applied to the baseline latencies: 1.0 on the baseline's host; with
+    ``cross_host`` on another host, how much slower the calibration workload
+    runs here than where the baseline was recorded.
+    """
+    base_host, cur_host = baseline["meta"].get("host"), current["meta"]["host"]
+    base_cal = baseline["meta"].get("calibration_ms")
+    if not base_host or not base_cal:
+        raise HostMismatch("baseline has no host fingerprint or calibration time; re-record it with --save-baseline")
+    ratio = current["meta"]["calibration_ms"] / base_cal
+    print(f"\ncalibration workload: {current['meta']['calibration_ms']:.2f} ms here, {base_cal:.2f} ms in the baseline")
+    if base_host == cur_host:
+        return 1.0
+    diff = {k: (base_host.get(k), cur_host[k]) for k in cur_host if base_host.get(k) != cur_host[k]}
+    if not cross_host:
+        raise HostMismatch(f"baseline host differs (baseline, here): {diff}; re-record it here with "
+                           "--save-baseline, or compare calibration-scaled numbers with --cross-host")
+    print(f"other host {diff}: baseline latencies scaled by {ratio:.3f}, indicative only")
+    return ratio
+
+
+def compare(current: dict, baseline: dict, time_tolerance: float, memory_tolerance: float,
+            metric: str = "min_ms", scale: float = 1.0) -> list[dict]:
+    """
+    Cases whose fastest round of latency ``metric`` exceeds the slowest
+    baseline round (times ``scale``), or whose peak memory grew, beyond the tolerance.
+    """
+    regressions = []
+    print(f"\n{'case':<44}{'cur best':>10}{'base max':>10}{'change':>9}   {'peak KiB':>10}{'change':>9}")
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or metric not in base:
+            print(f"{name:<44}{cur[metric]:>10.3f}{'-':>10}{'new':>9}")
+            continue
+        cur = {**cur, metric: min(cur["rounds"][metric])}
+        slowest = max(base.get("rounds", {}).get(metric) or [base[metric]])
+        base = {**base, metric: slowest * scale}
+        dt = cur[metric] / base[metric] - 1.0 if base[metric] else 0.0
+        dm = cur["peak_kib"] / base["peak_kib"] - 1.0 if base["peak_kib"] else 0.0
+        flags = []
+        if dt > time_tolerance and cur[metric] - base[metric] > MIN_TIME_DELTA_MS:
+            flags.append("latency")
+        if dm > memory_tolerance and cur["peak_kib"] - base["peak_kib"] > MIN_MEMORY_DELTA_KIB:
+            flags.append("memory")
+        print(f"{name:<44}{cur[metric]:>10.3f}{base[metric]:>10.3f}{dt:>+9.1%}   "
+              f"{cur['peak_kib']:>10.1f}{dm:>+9.1%}" + ("   REGRESSION (" + ", ".join(flags) + ")" if flags else ""))
+        if flags:
+            regressions.append({"case": name, "kinds": flags, "latency_change": dt, "peak_change": dm})
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark churn scoring, encoding and explanations")
+    parser.add_argument("--data", default=DEFAULT_DATA)
+    parser.add_argument("--model", default="data/models/churn_model.joblib")
+    parser.add_argument("--kinds", nargs="+", default=["logistic", "gradient_boosting"])
+    parser.add_argument("--repeat", type=int, default=50, help="minimum timed calls per case and round")
+    parser.add_argument("--rounds", type=int, default=5, help="suite passes; each case reports their median")
+    parser.add_argument("--out", help="write the results as JSON")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.25, help="allowed latency growth, 0.25 = +25%%")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10, help="allowed peak memory growth")
+    parser.add_argument("--metric", default="min_ms", choices=["min_ms", "p50_ms", "p95_ms", "mean_ms"],
+                        help="latency statistic compared with the baseline")
+    parser.add_argument("--cross-host", action="store_true",
+                        help="compare with a baseline from another host (calibration-scaled, indicative only)")
+    args = parser.parse_args()
+
+    current = run(args.data, args.model, args.kinds, args.repeat, args.rounds)
+    if args.out:
+        Path(args.out).write_text(json.dumps(current, indent=2))
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(current, indent=2) + "\n")
+        print(f"\nSaved baseline to {args.baseline}")
+    elif Path(args.baseline).exists():
+        baseline = json.loads(Path(args.baseline).read_text())
+        try:
+            scale = host_scale(current, baseline, args.cross_host)
+        except HostMismatch as e:
+            print(f"\nNot comparing with {args.baseline}: {e}")
+            sys.exit(2)
+        regressions = compare(current, baseline, args.time_tolerance, args.memory_tolerance, args.metric, scale)
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}")
+        sys.exit(1 if regressions else 0)
+    else:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
@@ -0,0 +1,321 @@
+"""
+Bulk scoring of the ``customers`` table.
+
+Customers are read through a server-side cursor in fixed-size chunks, scored
+with one vectorized model call per chunk and written back with ``COPY`` into
+a staging table that is merged into ``churn_scores``. Memory use depends on
+the chunk size only, not on the table size.
+
+Every score row keeps an md5 of the feature columns it was computed from.
+The importer flags inserted and changed customers ``score_pending``; an
+incremental run reads only those rows through a partial index and clears the
+flag of every row whose score (for the hashed data) it wrote, so its cost
+follows the amount of changed data instead of the table size. After a model
+change every score is stale, and the run compares all hashes and versions
+instead. Rows the encoder rejects are stored too, with a NULL ``churn_proba``
+and the reason in ``error``, so they are skipped like any other scored row
+until their data or the model changes. Scores of deleted customers (the
+importer never deletes) are dropped by full runs.
+
+With ``on_delta`` every committed chunk (and the pruning of removed
+customers) reports how it changed the table-wide ``score_totals``, so an
+in-memory aggregate can follow the table without rescanning it.
+"""
+import argparse
+import io
+import sys
+import time
+import typing as t
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+from core.churn_model import ChurnModel, load_or_train
+from core.feature_encoder import ID_COLUMN
+from db.schema import SCORE_PENDING_COLUMN, add_column, ensure_score_pending, has_column, key_totals, totals_sql
+from rag.db_connector import iter_query
+
+SCORES_TABLE = "churn_scores"
+
+SCORES_DDL = f"""
+CREATE TABLE IF NOT EXISTS {SCORES_TABLE} (
+    customerid TEXT PRIMARY KEY,
+    churn_proba DOUBLE PRECISION,
+    model_version TEXT NOT NULL,
+    scored_at TIMESTAMPTZ NOT NULL,
+    features_hash TEXT,
+    error TEXT
+)
+"""
+
+HASH_COLUMN = "features_hash"
+# why the encoder rejected the row; churn_proba is NULL then
+ERROR_COLUMN = "error"
+HIGH_RISK_THRESHOLD = 0.7
+
+DeltaCallback = t.Callable[[dict[str, float]], None]
+
+
+def score_totals(high_risk: float = HIGH_RISK_THRESHOLD) -> dict[str, str]:
+    """Running totals of ``churn_scores`` kept by the dashboard aggregate store."""
+    return {
+        # rejected rows have no probability and are not counted
+        "scored": "COUNT(churn_proba)",
+        "proba_sum": "COALESCE(SUM(churn_proba), 0)",
+        "high_risk": f"COUNT(*) FILTER (WHERE churn_proba >= {float(high_risk)!r})",
+    }
+
+
+def ensure_scores_table(engine) -> None:
+    """Create or migrate ``churn_scores``; every step is checked first, so an up-to-date table is not locked."""
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT to_regclass(:table)"), {"table": SCORES_TABLE}).scalar() is None:
+            conn.execute(text(SCORES_DDL))
+        # tables created before change tracking / rejection markers
+        add_column(conn, SCORES_TABLE, HASH_COLUMN, "TEXT")
+        add_column(conn, SCORES_TABLE, ERROR_COLUMN, "TEXT")
+        nullable = conn.execute(text(
+            "SELECT is_nullable FROM information_schema.columns "
+            "WHERE table_name = :table AND column_name = 'churn_proba'"
+        ), {"table": SCORES_TABLE}).scalar()
+        if nullable == "NO":
+            conn.execute(text(f"ALTER TABLE {SCORES_TABLE} ALTER COLUMN churn_proba DROP NOT NULL"))
+        # finds scores of other model versions without a scan
+        if conn.execute(text("SELECT to_regclass(:index)"),
+                        {"index": f"{SCORES_TABLE}_model_version_idx"}).scalar() is None:
+            conn.execute(text(f"CREATE INDEX {SCORES_TABLE}_model_version_idx ON {SCORES_TABLE} (model_version)"))
+
+
+def ensure_change_tracking(engine) -> None:
+    """``customers.score_pending``; normally added by the importer."""
+    with engine.begin() as conn:
+        if not has_column(conn, "customers", SCORE_PENDING_COLUMN):
+            ensure_score_pending(conn)
+
+
+def feature_columns(model: ChurnModel) -> list[str]:
+    return list(model.encoder.numeric) + list(model.encoder.categories)
+
+
+def features_hash_sql(model: ChurnModel, alias: str = "c") -> str:
+    """SQL expression hashing the model's feature columns of one ``customers`` row."""
+    return f"md5(ROW({', '.join(f'{alias}.{col}' for col in feature_columns(model))})::text)"
+
+
+def customer_query(model: ChurnModel) -> str:
+    columns = ", ".join(f"c.{col}" for col in [ID_COLUMN] + feature_columns(model))
+    return (f"SELECT {columns}, {features_hash_sql(model)} AS {HASH_COLUMN} "
+            f"FROM customers c ORDER BY c.{ID_COLUMN}")
+
+
+def pending_customer_query(model: ChurnModel) -> str:
+    """Customers the importer inserted or changed since their last score (partial index scan)."""
+    columns = ", ".join(f"c.{col}" for col in [ID_COLUMN] + feature_columns(model))
+    return (f"SELECT {columns}, {features_hash_sql(model)} AS {HASH_COLUMN} "
+            f"FROM customers c WHERE c.{SCORE_PENDING_COLUMN} ORDER BY c.{ID_COLUMN}")
+
+
+def changed_customer_query(model: ChurnModel) -> str:
+    """
+    Customers without a score (or rejection marker), or whose features or
+    scoring model changed since it. Compares every row: used after a model change.
+    """
+    columns = ", ".join(f"c.{col}" for col in [ID_COLUMN] + feature_columns(model))
+    return f"""
+        SELECT {columns}, h.{HASH_COLUMN}
+        FROM customers c
+        CROSS JOIN LATERAL (SELECT {features_hash_sql(model)} AS {HASH_COLUMN}) h
+        LEFT JOIN {SCORES_TABLE} s ON s.{ID_COLUMN} = c.{ID_COLUMN}
+        WHERE s.{ID_COLUMN} IS NULL
+           OR s.model_version <> :model_version
+           OR s.{HASH_COLUMN} IS DISTINCT FROM h.{HASH_COLUMN}
+        ORDER BY c.{ID_COLUMN}
+    """
+
+
+def has_stale_scores(engine, model_version: str) -> bool:
+    """Any score of another model version? Two ranges of the model_version index, not a scan."""
+    with engine.connect() as conn:
+        return conn.execute(text(
+            f"SELECT 1 FROM {SCORES_TABLE} WHERE model_version < :v OR model_version > :v LIMIT 1"
+        ), {"v": model_version}).first() is not None
+
+
+def prune_scores(engine, on_delta: DeltaCallback | None = None,
+                 high_risk: float = HIGH_RISK_THRESHOLD) -> int:
+    """Drop scores of customers that no longer exist; returns the number removed."""
+    totals = score_totals(high_risk)
+    with engine.begin() as conn:
+        row = conn.execute(text(
+            f"WITH gone AS (DELETE FROM {SCORES_TABLE} s WHERE NOT EXISTS "
+            f"(SELECT 1 FROM customers c WHERE c.{ID_COLUMN} = s.{ID_COLUMN}) RETURNING s.*) "
+            + totals_sql("gone", totals)
+        )).one()
+    removed = dict(zip(totals, (float(v or 0) for v in row)))
+    if on_delta is not None and removed["scored"]:
+        on_delta({name: -value for name, value in removed.items()})
+    return int(removed["scored"])
+
+
+class ScoreWriter:
+    """
+    COPYs score chunks into a temp staging table and upserts them into
+    ``churn_scores``. With ``hash_sql`` (see ``features_hash_sql``) it also
+    clears ``score_pending`` of the customers whose current data is the data
+    that was scored; rows changed meanwhile stay pending.
+    """
+
+    def __init__(self, engine, totals: dict[str, str] | None = None, hash_sql: str | None = None):
+        self.totals = totals
+        self.hash_sql = hash_sql
+        self._raw = engine.raw_connection()
+        self._cur = self._raw.cursor()
+        self._cur.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {SCORES_TABLE}_stage "
+            f"(LIKE {SCORES_TABLE} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+
+    def write(self, ids: t.Sequence[str], proba: np.ndarray, model_version: str, scored_at: datetime,
+              hashes: t.Sequence[str] | None = None,
+              errors: t.Sequence[str | None] | None = None) -> dict[str, float] | None:
+        """
+        Upsert one chunk; NaN in ``proba`` stores a rejection with its reason
+        from ``errors``. Returns the change of ``totals`` if the writer tracks them.
+        """
+        buf = io.StringIO()
+        # NaN and None become empty fields, which COPY reads as NULL
+        pd.DataFrame({
+            "customerid": ids,
+            "churn_proba": proba,
+            "model_version": model_version,
+            "scored_at": scored_at.isoformat(),
+            HASH_COLUMN: hashes,
+            ERROR_COLUMN: errors,
+        }).to_csv(buf, header=False, index=False)
+        buf.seek(0)
+        columns = f"customerid, churn_proba, model_version, scored_at, {HASH_COLUMN}, {ERROR_COLUMN}"
+        self._cur.copy_expert(f"COPY {SCORES_TABLE}_stage ({columns}) FROM STDIN WITH (FORMAT csv)", buf)
+        stage = f"{SCORES_TABLE}_stage"
+        before = key_totals(self._cur, SCORES_TABLE, stage, "customerid", self.totals) if self.totals else None
+        self._cur.execute(f"""
+            INSERT INTO {SCORES_TABLE} ({columns}) SELECT {columns} FROM {SCORES_TABLE}_stage
+            ON CONFLICT (customerid) DO UPDATE SET
+                churn_proba = EXCLUDED.churn_proba,
+                model_version = EXCLUDED.model_version,
+                scored_at = EXCLUDED.scored_at,
+                {HASH_COLUMN} = EXCLUDED.{HASH_COLUMN},
+                {ERROR_COLUMN} = EXCLUDED.{ERROR_COLUMN}
+        """)
+        if self.hash_sql is not None and hashes is not None:
+            self._cur.execute(f"""
+                UPDATE customers c SET {SCORE_PENDING_COLUMN} = false
+                FROM {stage} s
+                WHERE c.{ID_COLUMN} = s.customerid AND c.{SCORE_PENDING_COLUMN}
+                  AND {self.hash_sql} = s.{HASH_COLUMN}
+            """)
+        delta = None
+        if before is not None:
+            after = key_totals(self._cur, SCORES_TABLE, stage, "customerid", self.totals)
+            delta = {name: after[name] - before[name] for name in after}
+        self._raw.commit()
+        return delta
+
+    def close(self) -> None:
+        self._cur.close()
+        self._raw.close()
+
+
+def score_frames(frames: t.Iterable[pd.DataFrame], engine, model: ChurnModel,
+                 on_chunk: t.Callable[[int], None] | None = None, on_delta: DeltaCallback | None = None,
+                 high_risk: float = HIGH_RISK_THRESHOLD) -> dict:
+    """Score and persist every chunk of ``frames``; returns row counts and throughput."""
+    ensure_scores_table(engine)
+    ensure_change_tracking(engine)
+    scored_at = datetime.now(timezone.utc)
+    writer = ScoreWriter(engine, score_totals(high_risk) if on_delta else None, features_hash_sql(model))
+    start = time.perf_counter()
+    rows = rejected = 0
+    try:
+        for chunk in frames:
+            hashes = chunk[HASH_COLUMN].to_numpy() if HASH_COLUMN in chunk.columns else None
+            X, errors = model.encoder.transform(chunk.drop(columns=[ID_COLUMN, HASH_COLUMN], errors="ignore"),
+                                                collect_errors=True)
+            ok = np.array([e is None for e in errors], dtype=bool)
+            # rejected rows are written with a NULL probability and their error
+            proba = np.full(len(chunk), np.nan)
+            if ok.any():
+                proba[ok] = model.predict_proba(X[ok])[:, 1]
+            delta = writer.write(chunk[ID_COLUMN].astype(str).to_numpy(), proba, model.version, scored_at,
+                                 hashes, errors)
+            if on_delta is not None:
+                on_delta(delta)
+            rows += int(ok.sum())
+            rejected += int((~ok).sum())
+            if on_chunk is not None:
+                on_chunk(rows)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "rejected": rejected,
+        "model_version": model.version,
+        "scored_at": scored_at.isoformat(),
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed else 0.0,
+    }
+
+
+def score_customers(engine, model: ChurnModel, chunk_size: int = 10_000,
+                    on_chunk: t.Callable[[int], None] | None = None, on_delta: DeltaCallback | None = None,
+                    high_risk: float = HIGH_RISK_THRESHOLD) -> dict:
+    """Rescore the whole ``customers`` table and drop the scores of deleted customers."""
+    frames = iter_query(engine, customer_query(model), chunk_size=chunk_size)
+    stats = score_frames(frames, engine, model, on_chunk=on_chunk, on_delta=on_delta, high_risk=high_risk)
+    stats["removed"] = prune_scores(engine, on_delta=on_delta, high_risk=high_risk)
+    return stats
+
+
+def score_changed_customers(engine, model: ChurnModel, chunk_size: int = 10_000,
+                            on_chunk: t.Callable[[int], None] | None = None,
+                            on_delta: DeltaCallback | None = None,
+                            high_risk: float = HIGH_RISK_THRESHOLD) -> dict:
+    """Rescore only customers that are new or changed, or were scored by another model version."""
+    ensure_scores_table(engine)
+    ensure_change_tracking(engine)
+    if has_stale_scores(engine, model.version):
+        # new model: every score is stale, compare them all once
+        frames = iter_query(engine, changed_customer_query(model), {"model_version": model.version},
+                            chunk_size=chunk_size)
+        mode = "model_changed"
+    else:
+        frames = iter_query(engine, pending_customer_query(model), chunk_size=chunk_size)
+        mode = "pending"
+    stats = score_frames(frames, engine, model, on_chunk=on_chunk, on_delta=on_delta, high_risk=high_risk)
+    stats["selection"] = mode
+    return stats
+
+
+if __name__ == "__main__":
+    from db.engine import get_engine
+
+    parser = argparse.ArgumentParser(description="Score every customer and store the results in churn_scores")
+    parser.add_argument("--model", default="data/models/churn_model.joblib")
+    parser.add_argument("--data", default="data/raw/Telco-Customer-Churn.csv",
+                        help="training data, used only if the model artifact is missing")
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--full", action="store_true",
+                        help="rescore every customer instead of only new/changed ones")
+    args = parser.parse_args()
+
+    score = score_customers if args.full else score_changed_customers
+    # batch job: no statement timeout
+    stats = score(get_engine(statement_timeout_ms=0), load_or_train(args.model, args.data), args.chunk_size,
+                  on_chunk=lambda n: print(f"  {n} rows scored", flush=True))
+    print(f"Scored {stats['rows']} customers ({stats['rows_per_second']:.0f} rows/s), "
+          f"{stats['rejected']} rejected, model {stats['model_version']}")
@@ -0,0 +1,170 @@
+"""
+In-process churn classifier trained on the Telco customer dataset.
+
+The model is trained once (``python -m core.churn_model``), persisted with
+joblib and scored in-process, so a prediction costs a dot product instead of
+an LLM round trip.
+"""
+import argparse
+import hashlib
+import os
+import pickle
+import struct
+import typing as t
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from core.feature_encoder import TARGET_COLUMN, FeatureEncoder
+from core import snapshot as dataset_snapshot
+
+MODEL_KINDS = ("logistic", "gradient_boosting")
+# bumped whenever the pickled layout changes; stale artifacts are retrained
+ARTIFACT_FORMAT = 2
+# what joblib.load raises on a stale class layout (Type/AttributeError) or a file
+# truncated at an arbitrary byte (the rest, depending on where the cut falls)
+UNREADABLE_ARTIFACT = (TypeError, AttributeError, EOFError, pickle.UnpicklingError,
+                       ValueError, IndexError, struct.error)
+
+
+def load_dataset(path: str | Path, snapshot: bool = True) -> pd.DataFrame:
+    """The parsed Telco CSV, served from its memory-mapped columnar snapshot when possible."""
+    return dataset_snapshot.load(path) if snapshot else dataset_snapshot.parse_csv(path)
+
+
+def _build_estimator(kind: str, random_state: int):
+    if kind == "logistic":
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+        return make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000))
+    if kind == "gradient_boosting":
+        from sklearn.ensemble import GradientBoostingClassifier
+        return GradientBoostingClassifier(n_estimators=150, max_depth=3, random_state=random_state)
+    raise ValueError(f"Unknown model kind {kind!r}, expected one of {MODEL_KINDS}")
+
+
+class ChurnModel:
+    """Trained estimator together with the feature encoder it was fitted on."""
+
+    def __init__(self, estimator, kind: str, encoder: FeatureEncoder, version: str,
+                 feature_means: np.ndarray | None = None):
+        self.format = ARTIFACT_FORMAT
+        self.estimator = estimator
+        self.kind = kind
+        self.encoder = encoder
+        self.version = version
+        # training-set column means: the background for linear attributions
+        self.feature_means = feature_means
+        self._linear = self._fold_linear() if kind == "logistic" else None
+
+    @property
+    def feature_names(self) -> list[str]:
+        return self.encoder.feature_names
+
+    @property
+    def n_features(self) -> int:
+        return self.encoder.n_features
+
+    # ---- training / persistence -------------------------------------------------
+
+    @classmethod
+    def train(cls, data_path: str | Path, kind: str = "logistic", random_state: int = 0) -> "ChurnModel":
+        df = load_dataset(data_path)
+        y = (df[TARGET_COLUMN] == "Yes").astype(int).to_numpy()
+        encoder = FeatureEncoder.from_frame(df)
+
+        digest = hashlib.sha1(Path(data_path).read_bytes())
+        digest.update(f"{kind}:{random_state}".encode())
+        model = cls(None, kind, encoder, version=f"{kind}-{digest.hexdigest()[:10]}")
+
+        X = encoder.transform(df)
+        model.estimator = _build_estimator(kind, random_state).fit(X, y)
+        model.feature_means = X.mean(axis=0, dtype=np.float64)
+        model._linear = model._fold_linear() if kind == "logistic" else None
+        return model
+
+    def save(self, path: str | Path) -> None:
+        """Write to a temp file beside ``path`` and move it into place, so readers never see a partial file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            joblib.dump(self, tmp)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ChurnModel":
+        model = joblib.load(path)
+        if not isinstance(model, cls) or getattr(model, "format", 1) != ARTIFACT_FORMAT:
+            raise TypeError(f"{path} does not contain a format {ARTIFACT_FORMAT} ChurnModel")
+        return model
+
+    # ---- encoding ----------------------------------------------------------------
+
+    def encode(self, features: dict[str, t.Any]) -> np.ndarray:
+        return self.encoder.encode(features)
+
+    def vectorize(self, rows: pd.DataFrame | t.Sequence[dict[str, t.Any]]) -> np.ndarray:
+        return self.encoder.transform(rows)
+
+    def check_matrix(self, X) -> np.ndarray:
+        X = np.asarray(X)
+        if X.dtype not in (np.float32, np.float64):
+            X = X.astype(np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got shape {X.shape}")
+        return X
+
+    # ---- scoring -----------------------------------------------------------------
+
+    def _fold_linear(self) -> tuple[np.ndarray, float] | None:
+        """Collapse scaler + logistic regression into one weight vector for numpy-only scoring."""
+        if self.estimator is None:
+            return None
+        scaler, clf = self.estimator[0], self.estimator[-1]
+        w = clf.coef_[0] / scaler.scale_
+        b = float(clf.intercept_[0] - np.dot(w, scaler.mean_))
+        return w, b
+
+    def decision_function(self, X) -> np.ndarray:
+        X = self.check_matrix(X)
+        if self._linear is not None:
+            w, b = self._linear
+            return X @ w + b
+        return self.estimator.decision_function(X)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """sklearn-compatible ``(n, 2)`` probabilities."""
+        p = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - p, p])
+
+
+def load_or_train(model_path: str | Path, data_path: str | Path, kind: str = "logistic") -> ChurnModel:
+    """Load the persisted model, (re)training and saving it if the artifact is missing, stale or truncated."""
+    if Path(model_path).exists():
+        try:
+            return ChurnModel.load(model_path)
+        except UNREADABLE_ARTIFACT:
+            pass
+    model = ChurnModel.train(data_path, kind=kind)
+    model.save(model_path)
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the churn model on the Telco dataset")
+    parser.add_argument("--data", default="data/raw/Telco-Customer-Churn.csv")
+    parser.add_argument("--out", default="data/models/churn_model.joblib")
+    parser.add_argument("--kind", default="logistic", choices=MODEL_KINDS)
+    args = parser.parse_args()
+
+    trained = ChurnModel.train(args.data, kind=args.kind)
+    trained.save(args.out)
+    print(f"Saved {trained.version} ({trained.n_features} features) to {args.out}")
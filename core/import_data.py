@@ -1,22 +1,179 @@
+"""
+Streaming import of the Telco CSV into ``customers``.
+
+The file is read in fixed-size chunks; every chunk is ``COPY``-ed into a temp
+staging table and merged into ``customers`` with ``INSERT ... ON CONFLICT``,
+committed per chunk. The table and its indexes are never dropped, readers
+keep seeing the previous rows until a chunk commits, and rows whose values
+did not change are not rewritten (so they keep their score hashes and do not
+bloat the table). Inserted and changed rows are flagged ``score_pending`` for
+incremental rescoring. Imports that changed rows refresh the churn views of
+``db/schema.py``; with ``on_delta`` every committed chunk also reports how it
+changed the table-wide ``CUSTOMER_TOTALS``.
+
+    python core/import_data.py                               # data/raw/Telco-Customer-Churn.csv
+    python core/import_data.py path/to/customers.csv --chunk-size 100000
+"""
+import argparse
+import io
+import sys
+import time
+import typing as t
+from pathlib import Path
+
 import pandas as pd
-from sqlalchemy import create_engine
-import os
-from db.db_config import DATABASE_CONFIG
+from sqlalchemy import text
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+from core.feature_encoder import ID_COLUMN
+from db.schema import SCORE_PENDING_COLUMN, ensure_schema, ensure_score_pending, key_totals, refresh_views
+
+CUSTOMERS_TABLE = "customers"
+DEFAULT_PATH = "data/raw/Telco-Customer-Churn.csv"
+DEFAULT_CHUNK_SIZE = 50_000
+
+# running totals of customers kept by the dashboard aggregate store
+CUSTOMER_TOTALS = {
+    "customers": "COUNT(*)",
+    "churned": "COUNT(*) FILTER (WHERE churn = 'Yes')",
+    "monthly_charges": "COALESCE(SUM(monthlycharges), 0)",
+}
+
+
+def read_chunks(path: str | Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> t.Iterator[pd.DataFrame]:
+    """CSV chunks with lowercased column names and numeric ``totalcharges``."""
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        chunk.columns = [col.lower() for col in chunk.columns]
+        if "totalcharges" in chunk.columns:
+            # blank for customers in their first month
+            chunk["totalcharges"] = pd.to_numeric(chunk["totalcharges"], errors="coerce").fillna(0)
+        yield chunk
+
+
+def _sql_type(dtype) -> str:
+    if pd.api.types.is_integer_dtype(dtype):
+        return "BIGINT"
+    if pd.api.types.is_float_dtype(dtype):
+        return "DOUBLE PRECISION"
+    return "TEXT"
+
+
+def ensure_customers_table(engine, sample: pd.DataFrame) -> None:
+    """Create ``customers`` from the CSV's columns if missing; make ``customerid`` unique for upserts."""
+    columns = ", ".join(
+        f"{col} TEXT PRIMARY KEY" if col == ID_COLUMN else f"{col} {_sql_type(dtype)}"
+        for col, dtype in sample.dtypes.items()
+    )
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {CUSTOMERS_TABLE} ({columns})"))
+        # tables created by the old to_sql import have no key
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {CUSTOMERS_TABLE}_{ID_COLUMN}_key "
+            f"ON {CUSTOMERS_TABLE} ({ID_COLUMN})"
+        ))
+        ensure_score_pending(conn)
+
+
+class CustomerWriter:
+    """COPYs CSV chunks into a temp staging table and upserts them into ``customers``."""
+
+    def __init__(self, engine, columns: t.Sequence[str], totals: dict[str, str] | None = None):
+        self.columns = list(columns)
+        self.totals = totals
+        self._raw = engine.raw_connection()
+        self._cur = self._raw.cursor()
+        self._cur.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {CUSTOMERS_TABLE}_stage "
+            f"(LIKE {CUSTOMERS_TABLE} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+
+    def write(self, chunk: pd.DataFrame) -> tuple[int, int, dict[str, float] | None]:
+        """Merge one chunk; returns (inserted, updated) row counts and the change of ``totals``."""
+        buf = io.StringIO()
+        chunk[self.columns].to_csv(buf, header=False, index=False)
+        buf.seek(0)
+        columns = ", ".join(self.columns)
+        self._cur.copy_expert(f"COPY {CUSTOMERS_TABLE}_stage ({columns}) FROM STDIN WITH (FORMAT csv)", buf)
+        stage = f"{CUSTOMERS_TABLE}_stage"
+        before = key_totals(self._cur, CUSTOMERS_TABLE, stage, ID_COLUMN, self.totals) if self.totals else None
+        values = [col for col in self.columns if col != ID_COLUMN]
+        # DISTINCT ON: a key repeated inside one chunk would hit ON CONFLICT twice
+        self._cur.execute(f"""
+            INSERT INTO {CUSTOMERS_TABLE} AS c ({columns})
+            SELECT DISTINCT ON ({ID_COLUMN}) {columns} FROM {CUSTOMERS_TABLE}_stage
+            ON CONFLICT ({ID_COLUMN}) DO UPDATE SET
+                {", ".join(f"{col} = EXCLUDED.{col}" for col in values)},
+                {SCORE_PENDING_COLUMN} = true
+            WHERE ({", ".join(f"c.{col}" for col in values)})
+                IS DISTINCT FROM ({", ".join(f"EXCLUDED.{col}" for col in values)})
+            RETURNING (xmax = 0)
+        """)
+        flags = [row[0] for row in self._cur.fetchall()]
+        delta = None
+        if before is not None:
+            after = key_totals(self._cur, CUSTOMERS_TABLE, stage, ID_COLUMN, self.totals)
+            delta = {name: after[name] - before[name] for name in after}
+        self._raw.commit()
+        inserted = sum(flags)
+        return inserted, len(flags) - inserted, delta
+
+    def close(self) -> None:
+        self._cur.close()
+        self._raw.close()
+
 
+def import_customers(engine, path: str | Path = DEFAULT_PATH, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     on_chunk: t.Callable[[int], None] | None = None, refresh: bool = True,
+                     on_delta: t.Callable[[dict[str, float]], None] | None = None) -> dict:
+    """Upsert every row of the CSV at ``path`` into ``customers``; returns row counts and throughput."""
+    start = time.perf_counter()
+    rows = inserted = updated = 0
+    writer = None
+    try:
+        for chunk in read_chunks(path, chunk_size):
+            if writer is None:
+                ensure_customers_table(engine, chunk)
+                writer = CustomerWriter(engine, chunk.columns, CUSTOMER_TOTALS if on_delta else None)
+            ins, upd, delta = writer.write(chunk)
+            if on_delta is not None and (ins or upd):
+                on_delta(delta)
+            rows += len(chunk)
+            inserted += ins
+            updated += upd
+            if on_chunk is not None:
+                on_chunk(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - start
+    views_refreshed = False
+    if refresh and writer is not None:
+        ensure_schema(engine)
+        if inserted or updated:
+            refresh_views(engine)
+            views_refreshed = True
+    return {
+        "rows": rows,
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": rows - inserted - updated,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed else 0.0,
+        "views_refreshed": views_refreshed,
+    }
 
-engine = create_engine(f"postgresql+psycopg2://{DATABASE_CONFIG['user']}:{DATABASE_CONFIG['password']}@{DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}/{DATABASE_CONFIG['database']}")
-file_path = r'C:\Users\rafae\OneDrive\Desktop\projects\Client_Churn_analyzer\data\raw\Telco-Customer-Churn.csv'
-df = pd.read_csv(file_path)
 
-df.columns = [col.lower() for col in df.columns] 
-df['totalcharges'] = pd.to_numeric(df['totalcharges'], errors='coerce').fillna(0)
+if __name__ == "__main__":
+    from db.engine import get_engine
 
-df.to_sql(
-    name='customers',
-    con=engine,
-    if_exists='replace',  
-    index=False,
-    method='multi'
-)
+    parser = argparse.ArgumentParser(description="Import the customer CSV into the customers table")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
 
-print(f"Успешно импортировано {len(df)} записей в таблицу customers")
\ No newline at end of file
+    # batch job: no statement timeout
+    stats = import_customers(get_engine(statement_timeout_ms=0), args.path, args.chunk_size,
+                             on_chunk=lambda n: print(f"  {n} rows read", flush=True))
+    print(f"Успешно импортировано {stats['rows']} записей в таблицу customers "
+          f"({stats['inserted']} new, {stats['updated']} updated, {stats['rows_per_second']:.0f} rows/s)")
@@ -0,0 +1,113 @@
+"""
+Incremental extraction of the first JSON object from streamed LLM output.
+
+Models tend to wrap the requested JSON in prose ("Sure! Here is ..."), and
+keep talking after it. ``JSONObjectScanner`` is fed chunks as they arrive
+and returns the first balanced ``{...}`` that parses, so the caller can stop
+generation right there instead of waiting for (and paying for) the rest.
+
+A ``{`` in the prose (a placeholder, a quoted brace, an unmatched one) opens a
+candidate that never becomes an object, and its string and nesting state would
+hide the real object behind it. A candidate is therefore dropped as soon as it
+cannot parse any more, whether it closed or not, and the scan restarts from the
+next ``{``.
+"""
+import json
+import re
+
+# what an object cut off mid-token leaves at the decoder's error position: a
+# partial number, true/false/null or \uXXXX escape
+_PARTIAL_TOKEN = re.compile(r"[-+0-9.eE]+|t(?:r(?:ue?)?)?|f(?:a(?:l(?:se?)?)?)?|n(?:u(?:ll?)?)?|u[0-9a-fA-F]{0,4}")
+
+
+def _can_continue(fragment: str) -> bool:
+    """Whether more text could still turn the unclosed ``fragment`` into a JSON object."""
+    try:
+        json.JSONDecoder().raw_decode(fragment)
+    except json.JSONDecodeError as e:
+        rest = fragment[e.pos:]
+        return (not rest or e.msg.startswith("Unterminated string")
+                or _PARTIAL_TOKEN.fullmatch(rest) is not None)
+    return True
+
+
+class JSONObjectScanner:
+    """Feed text chunks; ``feed`` returns the first complete JSON object, else None."""
+
+    def __init__(self):
+        self.text = ""          # everything fed so far
+        self.chunks = 0
+        self._pos = 0           # next character to scan
+        self._start = -1        # index of the opening brace of the current candidate
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> dict | None:
+        self.text += chunk
+        self.chunks += 1
+        text = self.text
+        i = self._pos
+        while True:
+            obj, i = self._scan(text, i)
+            if obj is not None or self._start < 0 or _can_continue(text[self._start:]):
+                self._pos = i
+                return obj
+            # an open candidate that no longer parses: rescan right after its opening brace
+            i = self._restart()
+
+    def _restart(self) -> int:
+        i = self._start + 1
+        self._start, self._depth, self._in_string, self._escape = -1, 0, False, False
+        return i
+
+    def _scan(self, text: str, i: int) -> tuple[dict | None, int]:
+        while i < len(text):
+            if self._start < 0:
+                i = text.find("{", i)
+                if i < 0:
+                    i = len(text)
+                    break
+                self._start, self._depth = i, 0
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = text[self._start:i + 1]
+                    try:
+                        obj = json.loads(candidate)
+                    except json.JSONDecodeError:
+                        obj = None
+                    if isinstance(obj, dict):
+                        self._start = -1
+                        return obj, i + 1
+                    # "{placeholder}" in prose: rescan right after its opening brace
+                    i = self._restart()
+                    continue
+            i += 1
+        return None, i
+
+    @property
+    def pending(self) -> bool:
+        """An object has been opened but not closed yet."""
+        return self._start >= 0
+
+
+def first_json_object(text: str) -> dict:
+    """First balanced JSON object in a complete completion; ValueError if there is none."""
+    obj = JSONObjectScanner().feed(text or "")
+    if obj is None:
+        raise ValueError(f"Cannot find JSON in output: {(text or '')[:200]}...")
+    return obj
+
@@ -0,0 +1,108 @@
+"""
+Persistent, content-addressed cache for LLM completions.
+
+Entries live in a SQLite file so they survive worker restarts. The key is the
+model name plus a hash of the full message list and the sampling options, so
+any change to the prompt, the RAG context or the temperature is a new entry.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = "data/cache/llm_completions.sqlite3"
+
+
+def completion_key(model: str, messages: t.Sequence[dict], options: dict | None = None) -> str:
+    raw = json.dumps(
+        {"model": model, "messages": list(messages), "options": options or {}},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class CompletionCache:
+    """SQLite-backed completion store with size and age based eviction."""
+
+    def __init__(self, path: str | Path = DEFAULT_CACHE_PATH, max_bytes: int = 256 * 1024 * 1024,
+                 max_age: float = 30 * 24 * 3600, evict_every: int = 100):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.evict_every = evict_every
+        self.hits = self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS completions_last_used ON completions (last_used)")
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now - self.max_age:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, len(response.encode()), now, now),
+            )
+            self._puts += 1
+            if self._puts % self.evict_every == 0:
+                self._evict(now)
+
+    def evict(self) -> None:
+        with self._lock:
+            self._evict(time.time())
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM completions WHERE created_at < ?", (now - self.max_age,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # drop least recently used entries until the budget fits again
+        excess = total - self.max_bytes
+        freed = 0
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM completions ORDER BY last_used"):
+            doomed.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM completions WHERE key = ?", doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+            ).fetchone()
+        return {"entries": count, "bytes": size, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,255 @@
+"""
+Precomputed churn probabilities over the binned Telco feature lattice.
+
+Every encoder column group is an axis: a categorical column has one point per
+category, a numeric column a grid at training quantiles that is linearly
+interpolated (exact for a linear margin). Without interpolation numeric
+values are binned instead; for tree models the bins are the intervals
+between the model's own split thresholds, so each axis stays exact. The
+full lattice is far too large (~5M categorical combinations before any
+numeric bins), so the table is compiled in two parts:
+
+* a dense float32 margin table over the most influential axes, chosen
+  greedily within a cell budget, with every other axis at the reference row
+  (training medians/modes);
+* for each remaining axis a 1-D table of margin deltas against the reference.
+
+A lookup gathers one dense cell (multilinear interpolation over numeric key
+axes) and adds the deltas of the other axes; the model is never invoked. For
+a logistic model the decomposition is exact up to float32 rounding; for
+gradient boosting interactions across the two groups are lost, which
+``evaluate`` reports.
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from core.churn_model import ChurnModel, load_dataset, load_or_train
+
+DEFAULT_MAX_CELLS = 1 << 21
+DEFAULT_NUMERIC_POINTS = 16
+_CHUNK = 1 << 16
+
+
+class _Axis:
+    def __init__(self, name: str, offset: int, size: int, grid: np.ndarray | None = None,
+                 edges: np.ndarray | None = None):
+        self.name = name
+        self.offset = offset        # first encoder column of this axis
+        self.size = size            # number of lattice points
+        self.grid = grid            # numeric axes: grid values; categorical: None
+        self.edges = edges          # binned numeric axes: upper bin edges (x <= edge), no interpolation
+
+    @property
+    def numeric(self) -> bool:
+        return self.grid is not None
+
+    @property
+    def interpolated(self) -> bool:
+        return self.numeric and self.edges is None and self.size > 1
+
+    def set(self, X: np.ndarray, idx: np.ndarray) -> None:
+        """Write lattice point ``idx`` of this axis into the rows of ``X``."""
+        if self.numeric:
+            X[:, self.offset] = self.grid[idx]
+        else:
+            X[:, self.offset:self.offset + self.size] = 0.0
+            X[np.arange(len(X)), self.offset + idx] = 1.0
+
+    def locate(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Lower/upper lattice points of each row and the interpolation weight of the upper one."""
+        if not self.numeric:
+            i = X[:, self.offset:self.offset + self.size].argmax(axis=1)
+            return i, i, np.zeros(len(X))
+        if self.edges is not None:
+            # same float32 comparison as sklearn trees: x <= threshold goes left
+            i = np.searchsorted(self.edges, X[:, self.offset].astype(np.float32).astype(np.float64), side="left")
+            return i, i, np.zeros(len(X))
+        x = np.clip(X[:, self.offset].astype(np.float64), self.grid[0], self.grid[-1])
+        hi = np.clip(np.searchsorted(self.grid, x, side="right"), 1, self.size - 1) if self.size > 1 \
+            else np.zeros(len(X), dtype=np.intp)
+        lo = np.maximum(hi - 1, 0)
+        span = self.grid[hi] - self.grid[lo]
+        frac = np.divide(x - self.grid[lo], span, out=np.zeros(len(X)), where=span > 0)
+        return lo, hi, frac
+
+
+class LookupTable:
+    def __init__(self, model_version: str, axes: list[_Axis], key: list[int], table: np.ndarray,
+                 deltas: dict[int, np.ndarray], compile_seconds: float = 0.0):
+        self.model_version = model_version
+        self.axes = axes
+        self.key = key                      # axis indices of the dense table, in table order
+        self.table = table                  # float32 margins, shape = key axis sizes
+        self.deltas = deltas                # axis index -> float32 margin delta per lattice point
+        self.compile_seconds = compile_seconds
+        self._strides = np.array([s // table.itemsize for s in table.strides], dtype=np.intp)
+        self._numeric_key = [k for k, a in enumerate(key) if axes[a].interpolated]
+
+    # ---- compilation --------------------------------------------------------------
+
+    @staticmethod
+    def _split_thresholds(model: ChurnModel) -> dict[int, np.ndarray] | None:
+        trees = getattr(model.estimator, "estimators_", None)
+        if trees is None:
+            return None
+        found: dict[int, list[np.ndarray]] = {}
+        for est in np.ravel(trees):
+            tree = est.tree_
+            split = tree.feature >= 0
+            for f in np.unique(tree.feature[split]):
+                found.setdefault(int(f), []).append(tree.threshold[split & (tree.feature == f)])
+        return {f: np.unique(np.concatenate(v)) for f, v in found.items()}
+
+    @classmethod
+    def _axes(cls, model: ChurnModel, X: np.ndarray, numeric_points: int,
+              interpolate: bool) -> list[_Axis]:
+        enc = model.encoder
+        thresholds = cls._split_thresholds(model)
+        axes = []
+        for i, col in enumerate(enc.numeric):
+            if not interpolate and thresholds is not None:
+                edges = thresholds.get(i, np.empty(0))
+                # one representative value strictly inside every interval between splits
+                inner = (edges[:-1] + edges[1:]) / 2.0
+                grid = np.concatenate([edges[:1] - 1.0, inner, edges[-1:] + 1.0]) if len(edges) \
+                    else np.array([float(np.median(X[:, i]))])
+                axes.append(_Axis(col, i, len(grid), grid, edges))
+                continue
+            values = np.unique(X[:, i].astype(np.float64))
+            if len(values) > numeric_points:
+                values = np.unique(np.quantile(X[:, i], np.linspace(0.0, 1.0, numeric_points)))
+            # without interpolation a row takes the nearest grid point
+            edges = None if interpolate else (values[:-1] + values[1:]) / 2.0
+            axes.append(_Axis(col, i, len(values), values, edges))
+        for col, values in enc.categories.items():
+            axes.append(_Axis(col, enc._offsets[col], len(values)))
+        return axes
+
+    @classmethod
+    def compile(cls, model: ChurnModel, X: np.ndarray, *, max_cells: int = DEFAULT_MAX_CELLS,
+                numeric_points: int = DEFAULT_NUMERIC_POINTS, interpolate: bool = True) -> "LookupTable":
+        """Build the table for ``model``; ``X`` (encoded training rows) sets grids and axis ranking."""
+        start = time.perf_counter()
+        X = model.check_matrix(X)
+        axes = cls._axes(model, X, numeric_points, interpolate)
+        ref = model.encode({})
+        ref_margin = float(model.decision_function(ref[None, :])[0])
+
+        # margin delta of moving one axis away from the reference, for every lattice point
+        deltas = {}
+        for a, axis in enumerate(axes):
+            rows = np.repeat(ref[None, :], axis.size, axis=0)
+            axis.set(rows, np.arange(axis.size))
+            deltas[a] = (model.decision_function(rows) - ref_margin).astype(np.float32)
+
+        # the axes whose deltas vary most over the training rows go into the dense table
+        importance = []
+        for a, axis in enumerate(axes):
+            lo, hi, frac = axis.locate(X)
+            importance.append(float(np.var(deltas[a][lo] * (1 - frac) + deltas[a][hi] * frac)))
+        key, cells = [], 1
+        for a in sorted(range(len(axes)), key=lambda a: -importance[a]):
+            if cells * axes[a].size <= max_cells:
+                key.append(a)
+                cells *= axes[a].size
+
+        shape = tuple(axes[a].size for a in key)
+        table = np.empty(cells, dtype=np.float32)
+        for begin in range(0, cells, _CHUNK):
+            flat = np.arange(begin, min(begin + _CHUNK, cells))
+            rows = np.repeat(ref[None, :], len(flat), axis=0)
+            for a, idx in zip(key, np.unravel_index(flat, shape)):
+                axes[a].set(rows, idx)
+            table[flat] = model.decision_function(rows)
+        rest = {a: d for a, d in deltas.items() if a not in key}
+        return cls(model.version, axes, key, table.reshape(shape), rest,
+                   compile_seconds=time.perf_counter() - start)
+
+    # ---- lookup -------------------------------------------------------------------
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        X = np.atleast_2d(np.asarray(X))
+        n = len(X)
+        located = {a: self.axes[a].locate(X) for a in range(len(self.axes))}
+
+        base = np.zeros(n, dtype=np.intp)
+        for k, a in enumerate(self.key):
+            base += located[a][0] * self._strides[k]
+        flat = self.table.reshape(-1)
+        margin = np.zeros(n)
+        # multilinear interpolation: one gather per corner of the numeric key axes
+        for corner in itertools.product((0, 1), repeat=len(self._numeric_key)):
+            idx, weight = base.copy(), np.ones(n)
+            for k, bit in zip(self._numeric_key, corner):
+                lo, hi, frac = located[self.key[k]]
+                if bit:
+                    idx += (hi - lo) * self._strides[k]
+                weight *= frac if bit else 1.0 - frac
+            margin += weight * flat[idx]
+
+        for a, delta in self.deltas.items():
+            lo, hi, frac = located[a]
+            margin += delta[lo] * (1.0 - frac) + delta[hi] * frac
+        return margin
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """sklearn-compatible ``(n, 2)`` probabilities."""
+        p = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - p, p])
+
+    # ---- reporting ----------------------------------------------------------------
+
+    def stats(self) -> dict:
+        return {
+            "model_version": self.model_version,
+            "cells": int(self.table.size),
+            "bytes": int(self.table.nbytes + sum(d.nbytes for d in self.deltas.values())),
+            "key_axes": [self.axes[a].name for a in self.key],
+            "additive_axes": [self.axes[a].name for a in self.deltas],
+            "interpolated_axes": [a.name for a in self.axes if a.interpolated],
+            "compile_seconds": self.compile_seconds,
+        }
+
+    def evaluate(self, model: ChurnModel, X: np.ndarray) -> dict:
+        """Probability error of the table against the full model on ``X``."""
+        t0 = time.perf_counter()
+        p_model = model.predict_proba(X)[:, 1]
+        t1 = time.perf_counter()
+        p_table = self.predict_proba(X)[:, 1]
+        t2 = time.perf_counter()
+        err = np.abs(p_table - p_model)
+        return {
+            "rows": len(X),
+            "max_abs_error": float(err.max()),
+            "mean_abs_error": float(err.mean()),
+            "p99_abs_error": float(np.percentile(err, 99)),
+            "decision_agreement": float(np.mean((p_model >= 0.5) == (p_table >= 0.5))),
+            "model_us_per_row": (t1 - t0) * 1e6 / len(X),
+            "table_us_per_row": (t2 - t1) * 1e6 / len(X),
+        }
+
+
+def compile_for(model: ChurnModel, data_path: str, **kwargs) -> tuple[LookupTable, dict]:
+    """Compile against the training CSV and report the accuracy on it."""
+    X = model.vectorize(load_dataset(data_path))
+    table = LookupTable.compile(model, X, **kwargs)
+    return table, table.evaluate(model, X)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the churn lookup table and report its accuracy")
+    parser.add_argument("--model", default="data/models/churn_model.joblib")
+    parser.add_argument("--data", default="data/raw/Telco-Customer-Churn.csv")
+    parser.add_argument("--max-cells", type=int, default=DEFAULT_MAX_CELLS)
+    parser.add_argument("--numeric-points", type=int, default=DEFAULT_NUMERIC_POINTS)
+    parser.add_argument("--interpolate", action=argparse.BooleanOptionalAction, default=True,
+                        help="interpolate numeric axes instead of binning them")
+    args = parser.parse_args()
+
+    table, report = compile_for(load_or_train(args.model, args.data), args.data, max_cells=args.max_cells,
+                                numeric_points=args.numeric_points, interpolate=args.interpolate)
+    print(table.stats())
+    print(report)
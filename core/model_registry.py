@@ -0,0 +1,113 @@
+"""
+Versioned churn model artifacts on disk.
+
+    data/models/
+        CURRENT                          active version id
+        logistic-e0a0ec3edc/
+            model.joblib
+            manifest.json                kind, feature count, publish time
+
+Artifacts and the ``CURRENT`` pointer are written to a temp file and moved
+into place with ``os.replace``, so a reader (another worker, the file
+watcher) sees either the old or the new state, never a partial file.
+"""
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+from core.churn_model import MODEL_KINDS, ChurnModel
+
+ARTIFACT_NAME = "model.joblib"
+MANIFEST_NAME = "manifest.json"
+CURRENT_NAME = "CURRENT"
+
+
+def _atomic_write_text(path: Path, content: str) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(content, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class ModelRegistry:
+    def __init__(self, root: str | Path = "data/models"):
+        self.root = Path(root)
+
+    def artifact_path(self, version: str) -> Path:
+        if not version or Path(version).name != version or version.startswith("."):
+            raise ValueError(f"Invalid model version {version!r}")
+        return self.root / version / ARTIFACT_NAME
+
+    def versions(self) -> list[dict]:
+        """Published versions, newest first, with their manifests."""
+        out = []
+        for artifact in self.root.glob(f"*/{ARTIFACT_NAME}"):
+            manifest = artifact.with_name(MANIFEST_NAME)
+            meta = json.loads(manifest.read_text(encoding="utf-8")) if manifest.exists() else {}
+            out.append({"version": artifact.parent.name, **meta,
+                        "published_at": meta.get("published_at", artifact.stat().st_mtime)})
+        return sorted(out, key=lambda m: m["published_at"], reverse=True)
+
+    def has(self, version: str) -> bool:
+        return self.artifact_path(version).exists()
+
+    def publish(self, model: ChurnModel, *, activate: bool = False) -> str:
+        """Store ``model`` under its version; re-publishing the same version replaces it."""
+        path = self.artifact_path(model.version)
+        model.save(path)
+        _atomic_write_text(path.with_name(MANIFEST_NAME), json.dumps({
+            "kind": model.kind,
+            "n_features": model.n_features,
+            "published_at": time.time(),
+        }))
+        if activate:
+            self.activate(model.version)
+        return model.version
+
+    def current_version(self) -> str | None:
+        try:
+            return (self.root / CURRENT_NAME).read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    def activate(self, version: str) -> None:
+        if not self.has(version):
+            raise KeyError(f"Model version {version!r} is not in the registry")
+        self.root.mkdir(parents=True, exist_ok=True)
+        _atomic_write_text(self.root / CURRENT_NAME, version + "\n")
+
+    def load(self, version: str | None = None) -> ChurnModel:
+        version = version or self.current_version()
+        if version is None:
+            raise KeyError(f"No active model in {self.root}")
+        model = ChurnModel.load(self.artifact_path(version))
+        if model.version != version:
+            raise ValueError(f"Artifact {version!r} contains model {model.version!r}")
+        return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage versioned churn model artifacts")
+    parser.add_argument("--root", default="data/models")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    train = sub.add_parser("train", help="train a model and publish it")
+    train.add_argument("--data", default="data/raw/Telco-Customer-Churn.csv")
+    train.add_argument("--kind", default="logistic", choices=MODEL_KINDS)
+    train.add_argument("--activate", action="store_true")
+    sub.add_parser("list", help="list published versions")
+    act = sub.add_parser("activate", help="point CURRENT at a published version")
+    act.add_argument("version")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    if args.cmd == "train":
+        version = registry.publish(ChurnModel.train(args.data, kind=args.kind), activate=args.activate)
+        print(f"Published {version}" + (" (active)" if args.activate else ""))
+    elif args.cmd == "list":
+        current = registry.current_version()
+        for meta in registry.versions():
+            print(("* " if meta["version"] == current else "  ") + meta["version"], meta.get("kind", ""))
+    else:
+        registry.activate(args.version)
+        print(f"Activated {args.version}")
@@ -0,0 +1,73 @@
+"""
+asyncio-native Ollama client.
+
+All callers in a process share one ``httpx.AsyncClient`` per host, so LLM
+requests reuse keep-alive connections and an in-flight completion only holds
+a coroutine, not a threadpool thread.
+"""
+import json
+import typing as t
+
+import httpx
+
+DEFAULT_HOST = "http://localhost:11434"
+
+_clients: dict[str, "AsyncOllamaClient"] = {}
+
+
+class AsyncOllamaClient:
+    def __init__(self, host: str = DEFAULT_HOST, *, max_connections: int = 64,
+                 max_keepalive: int = 32, timeout: float = 120.0):
+        self.host = host.rstrip("/")
+        self._http = httpx.AsyncClient(
+            base_url=self.host,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive),
+            timeout=httpx.Timeout(timeout, connect=5.0),
+        )
+
+    async def chat(self, model: str, messages: t.Sequence[dict], options: dict | None = None) -> dict:
+        """Non-streaming ``/api/chat``; returns the same shape as ``ollama.chat``."""
+        payload = {"model": model, "messages": list(messages), "stream": False}
+        if options:
+            payload["options"] = options
+        resp = await self._http.post("/api/chat", json=payload)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def chat_stream(self, model: str, messages: t.Sequence[dict],
+                          options: dict | None = None) -> t.AsyncIterator[str]:
+        """Yield content chunks of a streaming ``/api/chat`` as Ollama produces them."""
+        payload = {"model": model, "messages": list(messages), "stream": True}
+        if options:
+            payload["options"] = options
+        async with self._http.stream("POST", "/api/chat", json=payload) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                content = chunk.get("message", {}).get("content")
+                if content:
+                    yield content
+                if chunk.get("done"):
+                    break
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+def get_async_client(host: str | None = None) -> AsyncOllamaClient:
+    """Process-wide pooled client for ``host``."""
+    host = (host or DEFAULT_HOST).rstrip("/")
+    client = _clients.get(host)
+    if client is None:
+        client = _clients[host] = AsyncOllamaClient(host)
+    return client
+
+
+async def close_async_clients() -> None:
+    while _clients:
+        _, client = _clients.popitem()
+        await client.aclose()
@@ -1,35 +1,233 @@
+import asyncio
+import json
+import typing as t
+from contextlib import aclosing, closing
 import ollama
 import sys
 from pathlib import Path
 
-project_root = Path(__file__).parent.parent 
+project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
-from db.vector_db import VectorDB
+from core.json_stream import JSONObjectScanner, first_json_object
+from core.llm_cache import DEFAULT_CACHE_PATH, CompletionCache, completion_key
+from core.ollama_async import DEFAULT_HOST, get_async_client
+
+JSON_RETRY_PROMPT = "That was not a valid answer ({error}). Reply with the JSON object only."
 
 
 class OllamaChurnExpert:
-    def __init__(self):
-        self.rag = VectorDB()
-        self.model = "llama3"
-        
-    def generate_answer(self, question: str) -> str:
-        context = self.rag.query(question)
-        
-        prompt = f"""
+    def __init__(self, model: str = "llama3", host: str | None = None, vector_db=None,
+                 top_k: int = 3, options: dict | None = None,
+                 cache_path: str | None = DEFAULT_CACHE_PATH,
+                 json_max_tokens: int = 256, json_attempts: int = 2):
+        # VectorDB loads an embedder, so it is only built when RAG is actually used
+        self._rag = vector_db
+        self.model = model
+        self.top_k = top_k
+        self.options = options or {}
+        self.host = host or DEFAULT_HOST
+        self.client = ollama.Client(host=host) if host else ollama
+        self.cache = CompletionCache(cache_path) if cache_path else None
+        # token budget shared by all attempts of one ask_json call
+        self.json_max_tokens = json_max_tokens
+        self.json_attempts = json_attempts
+
+    @property
+    def rag(self):
+        if self._rag is None:
+            from db.vector_db import VectorDB
+            self._rag = VectorDB()
+        return self._rag
+
+    def _complete(self, messages: list[dict], *, use_cache: bool = True) -> str:
+        key = completion_key(self.model, messages, self.options)
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = self.client.chat(model=self.model, messages=messages, options=self.options or None)
+        content = response["message"]["content"]
+        if use_cache and self.cache is not None:
+            self.cache.put(key, self.model, content)
+        return content
+
+    async def _acomplete(self, messages: list[dict], *, use_cache: bool = True) -> str:
+        key = completion_key(self.model, messages, self.options)
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = await get_async_client(self.host).chat(self.model, messages, self.options)
+        content = response["message"]["content"]
+        if use_cache and self.cache is not None:
+            self.cache.put(key, self.model, content)
+        return content
+
+    async def _astream(self, messages: list[dict], *, use_cache: bool = True):
+        key = completion_key(self.model, messages, self.options)
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts = []
+        # closing the upstream stream as soon as the consumer stops drops the
+        # connection, which makes Ollama stop generating
+        async with aclosing(get_async_client(self.host).chat_stream(self.model, messages, self.options)) as stream:
+            async for chunk in stream:
+                parts.append(chunk)
+                yield chunk
+        # only completions that ran to the end are cached
+        if use_cache and self.cache is not None:
+            self.cache.put(key, self.model, "".join(parts))
+
+    @staticmethod
+    def _messages(prompt: str | dict | list) -> list[dict]:
+        if isinstance(prompt, list):
+            return prompt
+        if isinstance(prompt, dict):
+            return [{"role": role, "content": prompt[role]} for role in ("system", "user") if prompt.get(role)]
+        return [{"role": "user", "content": prompt}]
+
+    def ask(self, prompt: str | dict | list, *, use_cache: bool = True) -> str:
+        """Single completion for a plain prompt, a {"system", "user"} pair or a message list."""
+        return self._complete(self._messages(prompt), use_cache=use_cache)
+
+    chat = ask
+
+    async def aask(self, prompt: str | dict | list, *, use_cache: bool = True) -> str:
+        return await self._acomplete(self._messages(prompt), use_cache=use_cache)
+
+    def astream(self, prompt: str | dict | list, *, use_cache: bool = True):
+        """Async iterator over completion chunks."""
+        return self._astream(self._messages(prompt), use_cache=use_cache)
+
+    # ---- structured answers -------------------------------------------------------
+    #
+    # The completion is streamed and scanned as it arrives; generation is cut
+    # off at the first balanced JSON object. An answer that fails ``validate``
+    # is retried with a corrective turn while the token budget lasts (one
+    # streamed chunk is one token).
+
+    def _json_key(self, messages: list[dict]) -> str:
+        return completion_key(self.model, messages, {**self.options, "stop_at_json": True})
+
+    def _json_cached(self, key: str, validate, use_cache: bool) -> dict | None:
+        if not use_cache or self.cache is None:
+            return None
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        obj = first_json_object(cached)
+        try:
+            validate(obj)
+        except ValueError:
+            return None
+        return obj
+
+    @staticmethod
+    def _check(scanner: JSONObjectScanner, obj: dict | None, validate) -> str | None:
+        """Error message for a finished attempt, None if ``obj`` is usable."""
+        if obj is None:
+            return "no complete JSON object" if scanner.pending or scanner.text else "empty answer"
+        try:
+            validate(obj)
+        except (ValueError, TypeError, KeyError) as e:
+            return str(e)
+        return None
+
+    def _json_done(self, key: str, obj: dict, use_cache: bool) -> dict:
+        if use_cache and self.cache is not None:
+            self.cache.put(key, self.model, json.dumps(obj, ensure_ascii=False))
+        return obj
+
+    def ask_json(self, prompt: str | dict | list, *, validate: t.Callable[[dict], t.Any] = lambda obj: None,
+                 use_cache: bool = True) -> dict:
+        """First JSON object of the answer that passes ``validate`` (which raises ValueError)."""
+        messages = self._messages(prompt)
+        key = self._json_key(messages)
+        cached = self._json_cached(key, validate, use_cache)
+        if cached is not None:
+            return cached
+
+        budget, error = self.json_max_tokens, None
+        for _ in range(self.json_attempts):
+            if budget <= 0:
+                break
+            scanner, obj = JSONObjectScanner(), None
+            stream = self.client.chat(model=self.model, messages=messages,
+                                      options={**self.options, "num_predict": budget}, stream=True)
+            with closing(stream):
+                for chunk in stream:
+                    obj = scanner.feed(chunk["message"]["content"] or "")
+                    if obj is not None:
+                        break
+            budget -= scanner.chunks
+            error = self._check(scanner, obj, validate)
+            if error is None:
+                return self._json_done(key, obj, use_cache)
+            messages = messages + [{"role": "assistant", "content": scanner.text},
+                                   {"role": "user", "content": JSON_RETRY_PROMPT.format(error=error)}]
+        raise ValueError(f"No valid JSON answer within {self.json_max_tokens} tokens: {error}")
+
+    async def aask_json(self, prompt: str | dict | list, *, validate: t.Callable[[dict], t.Any] = lambda obj: None,
+                        use_cache: bool = True) -> dict:
+        messages = self._messages(prompt)
+        key = self._json_key(messages)
+        cached = self._json_cached(key, validate, use_cache)
+        if cached is not None:
+            return cached
+
+        client = get_async_client(self.host)
+        budget, error = self.json_max_tokens, None
+        for _ in range(self.json_attempts):
+            if budget <= 0:
+                break
+            scanner, obj = JSONObjectScanner(), None
+            stream = client.chat_stream(self.model, messages, {**self.options, "num_predict": budget})
+            async with aclosing(stream):
+                async for chunk in stream:
+                    obj = scanner.feed(chunk)
+                    if obj is not None:
+                        break
+            budget -= scanner.chunks
+            error = self._check(scanner, obj, validate)
+            if error is None:
+                return self._json_done(key, obj, use_cache)
+            messages = messages + [{"role": "assistant", "content": scanner.text},
+                                   {"role": "user", "content": JSON_RETRY_PROMPT.format(error=error)}]
+        raise ValueError(f"No valid JSON answer within {self.json_max_tokens} tokens: {error}")
+
+    def _rag_prompt(self, question: str) -> str:
+        context = self.rag.query(question, top_k=self.top_k)
+
+        return f"""
         Контекст из базы данных:
         {context}
-        
+
         Вопрос аналитика:
         {question}
-        
+
         Сформулируй ответ:
         - Основная причина
         - Подтверждающие данные
         - Рекомендация
         """
-        
-        response = ollama.chat(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return response["message"]["content"]
\ No newline at end of file
+
+    def generate_answer(self, question: str, *, use_cache: bool = True) -> str:
+        prompt = self._rag_prompt(question)
+        return self._complete([{"role": "user", "content": prompt}], use_cache=use_cache)
+
+    async def agenerate_answer(self, question: str, *, use_cache: bool = True) -> str:
+        # retrieval embeds the question on CPU, keep it off the event loop
+        prompt = await asyncio.to_thread(self._rag_prompt, question)
+        return await self._acomplete([{"role": "user", "content": prompt}], use_cache=use_cache)
+
+    async def astream_answer(self, question: str, *, use_cache: bool = True):
+        """Streaming ``generate_answer``: yields answer chunks as they are generated."""
+        prompt = await asyncio.to_thread(self._rag_prompt, question)
+        async for chunk in self._astream([{"role": "user", "content": prompt}], use_cache=use_cache):
+            yield chunk
@@ -0,0 +1,145 @@
+"""
+Columnar snapshot of the Telco customer CSV.
+
+Parsing the CSV (and coercing ``TotalCharges``) on every start is the
+slowest part of training and of every analytics path. The parsed frame is
+cached as an uncompressed Arrow IPC file under ``data/cache/snapshots``:
+string columns are dictionary-encoded, numerics keep their types, and the
+file is opened with ``memory_map`` so loading is a few page mappings instead
+of a parse, and worker processes share the same page-cache pages.
+
+The snapshot records the size and mtime of the CSV it was built from and is
+rebuilt (atomically, so concurrent workers never read a partial file) when
+the source changes. pyarrow is optional: without it ``load`` parses the CSV.
+
+    python core/snapshot.py data/raw/Telco-Customer-Churn.csv     # build and time it
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+from core.feature_encoder import ID_COLUMN, NUMERIC_COLUMNS, canonical_name
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+SNAPSHOT_DIR = Path("data/cache/snapshots")
+# bumped whenever parsing or the stored layout changes
+SNAPSHOT_FORMAT = "1"
+
+
+def parse_csv(path: str | Path) -> pd.DataFrame:
+    """The CSV with canonical column names and numeric ``totalcharges``."""
+    df = pd.read_csv(path)
+    df.columns = [canonical_name(c) for c in df.columns]
+    # blank for customers in their first month
+    df["totalcharges"] = pd.to_numeric(df["totalcharges"], errors="coerce").fillna(0)
+    return df
+
+
+def snapshot_path(source: str | Path, snapshot_dir: str | Path = SNAPSHOT_DIR) -> Path:
+    return Path(snapshot_dir) / f"{Path(source).stem}.arrow"
+
+
+def _source_meta(source: Path) -> dict[bytes, bytes]:
+    st = source.stat()
+    return {
+        b"snapshot_format": SNAPSHOT_FORMAT.encode(),
+        b"source": str(source.resolve()).encode(),
+        b"source_size": str(st.st_size).encode(),
+        b"source_mtime_ns": str(st.st_mtime_ns).encode(),
+    }
+
+
+def _open(path: Path) -> "pa.Table":
+    with pa.memory_map(str(path), "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def is_fresh(source: str | Path, snapshot_dir: str | Path = SNAPSHOT_DIR) -> bool:
+    path = snapshot_path(source, snapshot_dir)
+    if pa is None or not path.exists():
+        return False
+    try:
+        with pa.memory_map(str(path), "r") as f:
+            meta = pa.ipc.open_file(f).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return False
+    expected = _source_meta(Path(source))
+    return all(meta.get(k) == v for k, v in expected.items())
+
+
+def build(source: str | Path, snapshot_dir: str | Path = SNAPSHOT_DIR) -> Path:
+    """Parse ``source`` and write its snapshot; returns the snapshot path."""
+    if pa is None:
+        raise RuntimeError("pyarrow is required to build dataset snapshots")
+    source = Path(source)
+    meta = _source_meta(source)
+    df = parse_csv(source)
+    for col in df.columns:
+        # low-cardinality strings become dictionary columns; the id stays a plain string
+        if col not in NUMERIC_COLUMNS and col != ID_COLUMN and pd.api.types.is_string_dtype(df[col]):
+            df[col] = df[col].astype("category")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **meta})
+
+    path = snapshot_path(source, snapshot_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        # uncompressed, so the mapped buffers are used as they are
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return path
+
+
+def load_table(source: str | Path, snapshot_dir: str | Path = SNAPSHOT_DIR) -> "pa.Table":
+    """Memory-mapped Arrow table of ``source``, rebuilding the snapshot if it is stale."""
+    if pa is None:
+        raise RuntimeError("pyarrow is required to load dataset snapshots")
+    if not is_fresh(source, snapshot_dir):
+        build(source, snapshot_dir)
+    return _open(snapshot_path(source, snapshot_dir))
+
+
+def load(source: str | Path, snapshot_dir: str | Path = SNAPSHOT_DIR) -> pd.DataFrame:
+    """
+    The parsed dataset as a DataFrame with categorical string columns. Falls
+    back to parsing the CSV when pyarrow is missing or the cache is not writable.
+    """
+    if pa is None:
+        return parse_csv(source)
+    try:
+        table = load_table(source, snapshot_dir)
+    except OSError:
+        return parse_csv(source)
+    # split_blocks keeps numeric columns as views of the mapped buffers where possible
+    return table.to_pandas(split_blocks=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the columnar snapshot of a customer CSV")
+    parser.add_argument("source", nargs="?", default="data/raw/Telco-Customer-Churn.csv")
+    parser.add_argument("--dir", default=str(SNAPSHOT_DIR))
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    path = build(args.source, args.dir)
+    t1 = time.perf_counter()
+    parse_csv(args.source)
+    t2 = time.perf_counter()
+    df = load(args.source, args.dir)
+    t3 = time.perf_counter()
+    print(f"{path}: {len(df)} rows, {path.stat().st_size / 1024:.0f} KiB, built in {t1 - t0:.3f}s; "
+          f"CSV parse {(t2 - t1) * 1000:.1f} ms, snapshot load {(t3 - t2) * 1000:.1f} ms")
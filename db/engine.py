@@ -0,0 +1,134 @@
+"""
+Process-wide SQLAlchemy engines.
+
+Every caller shares one pooled engine per (URL, statement timeout), so the
+number of open connections and the connection setup cost no longer grow with
+the number of ``DBConnector`` / ``VectorDB`` instances. Pools check
+connections before use (``pool_pre_ping``), recycle them periodically and
+set a server-side ``statement_timeout``; batch jobs (imports, bulk scoring)
+ask for ``statement_timeout_ms=0`` and get their own pool without a limit.
+
+The URL comes from ``DATABASE_URL`` if set, otherwise from
+``db/db_config.py``. Pools are tuned with ``DB_POOL_SIZE``,
+``DB_MAX_OVERFLOW``, ``DB_POOL_RECYCLE`` (seconds) and
+``DB_STATEMENT_TIMEOUT_MS``. ``get_async_engine`` returns the asyncpg-backed
+equivalent for coroutine code; asyncpg is optional.
+"""
+import os
+import threading
+import typing as t
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, Engine, make_url
+
+if t.TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+_engines: dict[tuple[str, int], Engine] = {}
+_async_engines: dict[tuple[str, int], "AsyncEngine"] = {}
+_lock = threading.Lock()
+
+
+def database_url(driver: str = "psycopg2") -> URL:
+    """The configured Postgres URL with ``driver`` as its DBAPI."""
+    raw = os.getenv("DATABASE_URL")
+    if raw:
+        url = make_url(raw)
+    else:
+        from db.db_config import DATABASE_CONFIG
+        url = URL.create(
+            "postgresql",
+            username=DATABASE_CONFIG["user"],
+            password=DATABASE_CONFIG["password"],
+            host=DATABASE_CONFIG["host"],
+            port=DATABASE_CONFIG["port"],
+            database=DATABASE_CONFIG["database"],
+        )
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername=f"postgresql+{driver}")
+    return url
+
+
+def _pool_options(url: URL) -> dict:
+    if url.get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
+def _key(url: URL, statement_timeout_ms: int) -> tuple[str, int]:
+    return url.render_as_string(hide_password=False), statement_timeout_ms
+
+
+def get_engine(url: str | URL | None = None, *, statement_timeout_ms: int | None = None) -> Engine:
+    """Shared pooled engine for ``url`` (default: the configured database)."""
+    url = make_url(url) if url is not None else database_url()
+    timeout = STATEMENT_TIMEOUT_MS if statement_timeout_ms is None else statement_timeout_ms
+    key = _key(url, timeout)
+    with _lock:
+        engine = _engines.get(key)
+        if engine is None:
+            connect_args = {}
+            if url.get_backend_name() == "postgresql" and url.get_driver_name() == "psycopg2":
+                connect_args["options"] = f"-c statement_timeout={timeout}"
+            engine = _engines[key] = create_engine(url, connect_args=connect_args, **_pool_options(url))
+    return engine
+
+
+def get_async_engine(url: str | URL | None = None, *,
+                     statement_timeout_ms: int | None = None) -> "AsyncEngine":
+    """Shared asyncpg engine; use it from the event loop that will run its queries."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = make_url(url) if url is not None else database_url("asyncpg")
+    timeout = STATEMENT_TIMEOUT_MS if statement_timeout_ms is None else statement_timeout_ms
+    key = _key(url, timeout)
+    with _lock:
+        engine = _async_engines.get(key)
+        if engine is None:
+            connect_args = {}
+            if url.get_driver_name() == "asyncpg":
+                connect_args["server_settings"] = {"statement_timeout": str(timeout)}
+            engine = _async_engines[key] = create_async_engine(url, connect_args=connect_args,
+                                                               **_pool_options(url))
+    return engine
+
+
+def pool_stats() -> dict[str, dict]:
+    """Pool occupancy of every engine created so far, keyed by URL (password hidden)."""
+    out = {}
+    with _lock:
+        for kind, engines in (("sync", _engines), ("async", _async_engines)):
+            for (_, timeout), engine in engines.items():
+                pool = engine.pool
+                name = f"{kind} {engine.url.render_as_string(hide_password=True)} timeout={timeout}ms"
+                out[name] = {
+                    "size": getattr(pool, "size", lambda: None)(),
+                    "checked_out": getattr(pool, "checkedout", lambda: None)(),
+                    "overflow": getattr(pool, "overflow", lambda: None)(),
+                }
+    return out
+
+
+def dispose_engines() -> None:
+    with _lock:
+        while _engines:
+            _, engine = _engines.popitem()
+            engine.dispose()
+
+
+async def close_async_engines() -> None:
+    with _lock:
+        engines = list(_async_engines.values())
+        _async_engines.clear()
+    for engine in engines:
+        await engine.dispose()
@@ -1,30 +1,32 @@
-import pandas as pd
-from sqlalchemy import create_engine
 from datetime import datetime
 import os
-from db_config import DATABASE_CONFIG
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+from rag.db_connector import DBConnector
+from db.schema import ensure_schema
 
 def generate_faq_from_db():
     try:
-        engine = create_engine(
-            f"postgresql+psycopg2://{DATABASE_CONFIG['user']}:{DATABASE_CONFIG['password']}@"
-            f"{DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}/{DATABASE_CONFIG['database']}"
-        )
+        db = DBConnector()
+        # both sections read precomputed rows from the churn materialized views
+        ensure_schema(db.engine)
         analysis_queries = {
             "Общая статистика оттока": """
                 SELECT 
-                    ROUND(100.0 * SUM(CASE WHEN churn = 'Yes' THEN 1 ELSE 0 END) / COUNT(*), 1) AS churn_rate,
-                    AVG(monthlycharges) AS avg_monthly_payment,
-                    AVG(tenure) AS avg_tenure_months
-                FROM customers
+                    ROUND(churn_rate::numeric, 1) AS churn_rate,
+                    avg_monthly_payment,
+                    avg_tenure_months
+                FROM churn_overview
             """,
             
             "Топ-5 факторов оттока": """
                 SELECT 
                     paymentmethod, 
-                    ROUND(100.0 * SUM(CASE WHEN churn = 'Yes' THEN 1 ELSE 0 END) / COUNT(*), 1) AS churn_rate
-                FROM customers
-                GROUP BY paymentmethod
+                    ROUND(churn_rate::numeric, 1) AS churn_rate
+                FROM churn_by_paymentmethod
                 ORDER BY churn_rate DESC
                 LIMIT 5
             """
@@ -36,7 +38,8 @@ def generate_faq_from_db():
         ]
 
         for section, query in analysis_queries.items():
-            df = pd.read_sql(query, engine)
+            # aggregates: a handful of rows, no need to stream
+            df = db.get_churn_data(query)
             md_content.append(f"\n## {section}\n")
             md_content.append(df.to_markdown(index=False))
 
@@ -0,0 +1,197 @@
+"""
+Indexes and materialized churn aggregates on top of ``customers``.
+
+Churn breakdowns (overall rate, rate per payment method / contract / internet
+service) and the churn trend over tenure cohorts are kept in materialized
+views, so dashboard, trend and FAQ queries read a few precomputed rows
+instead of scanning ``customers``. Every view has a
+unique index, which lets ``refresh_views`` use ``REFRESH ... CONCURRENTLY``:
+readers keep seeing the previous contents while a refresh runs. The importer
+refreshes the views after every import that changed rows.
+
+``customers.score_pending`` is the change tracking of incremental rescoring:
+the importer sets it on every inserted or changed row, bulk scoring clears it
+once ``churn_scores`` holds a score for exactly that data, and a partial index
+lets the next run find the pending rows without scanning the table.
+
+    python db/schema.py              # create missing indexes and views
+    python db/schema.py --refresh    # ... and refresh the views
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+CUSTOMERS_TABLE = "customers"
+INDEXED_COLUMNS = ("churn", "contract", "paymentmethod")
+# one churn_by_<dimension> view per column
+BREAKDOWN_DIMENSIONS = ("paymentmethod", "contract", "internetservice")
+OVERVIEW_VIEW = "churn_overview"
+SCORE_PENDING_COLUMN = "score_pending"
+
+# Tenure cohorts (customers grouped by months with the company) at every
+# granularity, per contract type and over all contracts (contract = '*')
+TREND_VIEW = "churn_tenure_rollup"
+TREND_GRANULARITIES = {"month": 1, "quarter": 3, "half_year": 6, "year": 12}
+ALL_CONTRACTS = "*"
+
+_CHURN_COUNTS = """
+    COUNT(*) AS customers,
+    COUNT(*) FILTER (WHERE churn = 'Yes') AS churned,
+    (100.0 * COUNT(*) FILTER (WHERE churn = 'Yes') / NULLIF(COUNT(*), 0))::double precision AS churn_rate,
+    AVG(monthlycharges)::double precision AS avg_monthly_payment,
+    AVG(tenure)::double precision AS avg_tenure_months
+"""
+
+
+def breakdown_view(dimension: str) -> str:
+    if dimension not in BREAKDOWN_DIMENSIONS:
+        raise ValueError(f"Unknown breakdown {dimension!r}, expected one of {BREAKDOWN_DIMENSIONS}")
+    return f"churn_by_{dimension}"
+
+
+def view_names() -> list[str]:
+    return [OVERVIEW_VIEW] + [breakdown_view(d) for d in BREAKDOWN_DIMENSIONS] + [TREND_VIEW]
+
+
+def _view_definitions() -> dict[str, tuple[str, str]]:
+    """view -> (SELECT, unique key column)"""
+    views = {
+        # constant key: CONCURRENTLY needs a unique index even on a one-row view
+        OVERVIEW_VIEW: (f"SELECT 1 AS id, {_CHURN_COUNTS} FROM {CUSTOMERS_TABLE}", "id"),
+    }
+    for dim in BREAKDOWN_DIMENSIONS:
+        views[breakdown_view(dim)] = (
+            f"SELECT {dim}, {_CHURN_COUNTS} FROM {CUSTOMERS_TABLE} GROUP BY {dim}", dim)
+    granularities = ", ".join(f"({m})" for m in TREND_GRANULARITIES.values())
+    views[TREND_VIEW] = (f"""
+        SELECT g.months AS granularity_months,
+               (tenure::int / g.months) * g.months AS tenure_from,
+               CASE WHEN GROUPING(contract) = 1 THEN '{ALL_CONTRACTS}' ELSE contract END AS contract,
+               {_CHURN_COUNTS}
+        FROM {CUSTOMERS_TABLE} CROSS JOIN (VALUES {granularities}) AS g(months)
+        GROUP BY GROUPING SETS ((g.months, tenure_from, contract), (g.months, tenure_from))
+    """, "granularity_months, tenure_from, contract")
+    return views
+
+
+def has_column(conn, table: str, column: str) -> bool:
+    return conn.execute(text(
+        "SELECT 1 FROM information_schema.columns WHERE table_name = :table AND column_name = :column"
+    ), {"table": table, "column": column}).first() is not None
+
+
+def add_column(conn, table: str, column: str, ddl: str) -> None:
+    """Add ``column`` if missing; checked first, since even a no-op ALTER TABLE queues for an exclusive lock."""
+    if not has_column(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {ddl}"))
+
+
+def ensure_score_pending(conn) -> None:
+    # existing rows start pending: the first incremental run after the upgrade scores them all
+    add_column(conn, CUSTOMERS_TABLE, SCORE_PENDING_COLUMN, "BOOLEAN NOT NULL DEFAULT true")
+
+
+def ensure_schema(engine) -> None:
+    """Create missing indexes and materialized views; safe to run on a live table."""
+    # CREATE INDEX CONCURRENTLY does not block writers but cannot run in a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        ensure_score_pending(conn)
+        for col in INDEXED_COLUMNS:
+            conn.execute(text(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {CUSTOMERS_TABLE}_{col}_idx "
+                f"ON {CUSTOMERS_TABLE} ({col})"
+            ))
+        # only the few pending rows are indexed
+        conn.execute(text(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {CUSTOMERS_TABLE}_{SCORE_PENDING_COLUMN}_idx "
+            f"ON {CUSTOMERS_TABLE} (customerid) WHERE {SCORE_PENDING_COLUMN}"
+        ))
+        for view, (select, key) in _view_definitions().items():
+            conn.execute(text(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {view} AS {select} WITH DATA"))
+            conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {view}_key ON {view} ({key})"))
+
+
+def churn_breakdown(engine, dimension: str | None = None) -> list[dict]:
+    """Rows of the overview view, or of the ``dimension`` breakdown ordered by churn rate."""
+    if dimension is None:
+        query = f"SELECT customers, churned, churn_rate, avg_monthly_payment, avg_tenure_months FROM {OVERVIEW_VIEW}"
+    else:
+        query = f"SELECT * FROM {breakdown_view(dimension)} ORDER BY churn_rate DESC"
+    with engine.connect() as conn:
+        return [dict(row) for row in conn.execute(text(query)).mappings()]
+
+
+def tenure_trend(engine, granularity: str = "quarter", contract: str | None = None,
+                 tenure_from: int | None = None, tenure_to: int | None = None) -> list[dict]:
+    """Churn per tenure cohort from the rollup view, ordered by cohort."""
+    if granularity not in TREND_GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity!r}, expected one of {tuple(TREND_GRANULARITIES)}")
+    months = TREND_GRANULARITIES[granularity]
+    query = text(f"""
+        SELECT tenure_from, tenure_from + :months - 1 AS tenure_to, customers, churned, churn_rate,
+               avg_monthly_payment
+        FROM {TREND_VIEW}
+        WHERE granularity_months = :months AND contract = :contract
+          AND tenure_from >= :lo AND tenure_from <= :hi
+        ORDER BY tenure_from
+    """)
+    params = {
+        "months": months,
+        "contract": contract or ALL_CONTRACTS,
+        # cohorts overlapping [tenure_from, tenure_to]
+        "lo": (tenure_from // months) * months if tenure_from is not None else -1,
+        "hi": tenure_to if tenure_to is not None else 1 << 30,
+    }
+    with engine.connect() as conn:
+        return [dict(row) for row in conn.execute(query, params).mappings()]
+
+
+def totals_sql(table: str, aggregates: dict[str, str], where: str = "") -> str:
+    """One-row SELECT of the named aggregate expressions over ``table``."""
+    exprs = ", ".join(f"{expr} AS {name}" for name, expr in aggregates.items())
+    return f"SELECT {exprs} FROM {table} {where}"
+
+
+def key_totals(cursor, table: str, stage: str, key: str, aggregates: dict[str, str]) -> dict[str, float]:
+    """
+    ``aggregates`` over the rows of ``table`` whose ``key`` is in the staging
+    table. Taken before and after an upsert in the same transaction, the
+    difference is the exact change the upsert made to the table-wide totals.
+    """
+    cursor.execute(totals_sql(table, aggregates, f"WHERE {key} IN (SELECT {key} FROM {stage})"))
+    return {name: float(value or 0) for name, value in zip(aggregates, cursor.fetchone())}
+
+
+def refresh_views(engine, concurrently: bool = True) -> dict:
+    """Recompute every view; returns the seconds spent per view."""
+    ensure_schema(engine)
+    timings = {}
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for view in view_names():
+            start = time.perf_counter()
+            conn.execute(text(f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if concurrently else ''}{view}"))
+            timings[view] = time.perf_counter() - start
+    return timings
+
+
+if __name__ == "__main__":
+    from db.engine import get_engine
+
+    parser = argparse.ArgumentParser(description="Create churn indexes and materialized views")
+    parser.add_argument("--refresh", action="store_true", help="also refresh the views")
+    args = parser.parse_args()
+
+    # batch job: no statement timeout
+    engine = get_engine(statement_timeout_ms=0)
+    if args.refresh:
+        for view, seconds in refresh_views(engine).items():
+            print(f"  {view}: refreshed in {seconds * 1000:.1f} ms")
+    else:
+        ensure_schema(engine)
+    print(f"Indexes on {', '.join(INDEXED_COLUMNS)}; views {', '.join(view_names())}")
@@ -1,16 +1,28 @@
 
+import threading
 import chromadb
 from sentence_transformers import SentenceTransformer
 from rag.db_connector import DBConnector
 
+_embedder = None
+_embedder_lock = threading.Lock()
+
+def get_embedder() -> SentenceTransformer:
+    """Process-wide embedder; loading the weights takes seconds, so it happens once."""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            _embedder = SentenceTransformer("all-MiniLM-L6-v2")
+    return _embedder
+
 class VectorDB:
-    def __init__(self):
-        self.embedder = SentenceTransformer("all-MiniLM-L6-v2")
-        self.client = chromadb.PersistentClient(path="data/rag_db")
+    def __init__(self, path: str = "data/rag_db"):
+        self.embedder = get_embedder()
+        self.client = chromadb.PersistentClient(path=path)
         self.collection = self.client.get_or_create_collection("churn_knowledge")
         self.db = DBConnector()
         
-    def _load_from_db(self):
+    def _load_from_db(self, limit: int = 1000, chunk_size: int = 256):
         """Загружает ключевые данные из серверной БД"""
         query = """
             SELECT 
@@ -18,14 +30,15 @@ class VectorDB:
                 contract || ' ' || paymentmethod || ' ' || 
                 CAST(monthlycharges AS TEXT) AS document_content
             FROM customers
-            WHERE churn = 'Yes'
-            LIMIT 1000
+            WHERE churn = :churn
+            LIMIT :limit
         """
-        df = self.db.get_churn_data(query)
-        self.collection.add(
-            ids=df["customerid"].astype(str).tolist(),
-            documents=df["document_content"].tolist()
-        )
+        # one chunk of rows (and of embeddings) in memory at a time
+        for df in self.db.iter_churn_data(query, {"churn": "Yes", "limit": limit}, chunk_size=chunk_size):
+            self.collection.add(
+                ids=df["customerid"].astype(str).tolist(),
+                documents=df["document_content"].tolist()
+            )
     
     def query(self, question: str, top_k: int = 3) -> list[str]:
         """Поиск релевантных данных"""
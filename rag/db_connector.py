@@ -1,28 +1,60 @@
-from sqlalchemy import create_engine
 import pandas as pd
 import sys
+import typing as t
 from pathlib import Path
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
 
-project_root = Path(__file__).parent.parent 
+project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-from db.db_config import DATABASE_CONFIG
+from db.engine import get_engine
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+def _statement(query: str | TextClause) -> TextClause:
+    return text(query) if isinstance(query, str) else query
+
+def iter_query(engine, query: str | TextClause, params: dict[str, t.Any] | None = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE, as_arrow: bool = False) -> t.Iterator[t.Any]:
+    """
+    Run ``query`` (with ``:name`` bind parameters from ``params``) through a
+    server-side cursor and yield DataFrames, or pyarrow RecordBatches with
+    ``as_arrow``, of at most ``chunk_size`` rows. Only one chunk is in memory
+    at a time; closing the generator early releases the cursor and connection.
+    """
+    if as_arrow:
+        import pyarrow as pa
+    # stream_results makes psycopg2 use a named (server-side) cursor
+    with engine.connect().execution_options(stream_results=True, max_row_buffer=chunk_size) as conn:
+        result = conn.execute(_statement(query), params or {})
+        columns = list(result.keys())
+        for rows in result.partitions(chunk_size):
+            if as_arrow:
+                yield pa.RecordBatch.from_arrays([pa.array(col) for col in zip(*rows)], names=columns)
+            else:
+                yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
 
 class DBConnector:
     def __init__(self):
-        self.engine = create_engine(
-            f"postgresql+psycopg2://{DATABASE_CONFIG['user']}:{DATABASE_CONFIG['password']}@"
-            f"{DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}/{DATABASE_CONFIG['database']}"
-        )
+        # shared pool: constructing connectors is free, connections are reused across them
+        self.engine = get_engine()
     def check_columns(self):
         columns = pd.read_sql(
         "SELECT column_name FROM information_schema.columns "
-        "WHERE table_name = 'customers'", 
+        "WHERE table_name = 'customers'",
         self.engine
     )
         print("Столбцы таблицы customers:")
         print(columns)
-    
-    def get_churn_data(self, query: str) -> pd.DataFrame:
-        return pd.read_sql(query, self.engine)
-    
\ No newline at end of file
+
+    def get_churn_data(self, query: str | TextClause, params: dict[str, t.Any] | None = None) -> pd.DataFrame:
+        """Whole result in one DataFrame; use ``iter_churn_data`` for large results."""
+        with self.engine.connect() as conn:
+            return pd.read_sql(_statement(query), conn, params=params)
+
+    def iter_churn_data(self, query: str | TextClause, params: dict[str, t.Any] | None = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE, as_arrow: bool = False) -> t.Iterator[t.Any]:
+        """Chunked variant of ``get_churn_data``, see ``iter_query``."""
+        return iter_query(self.engine, query, params, chunk_size, as_arrow)
+